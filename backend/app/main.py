@@ -1,14 +1,23 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.database import init_db
 from app.routers import upload, analysis, counterfactual, coach
+from app.services import counterfactual as counterfactual_service
+from app.services import scoring as scoring_service
+from app.services import temporal as temporal_service
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
     yield
+    # Don't leave spawned replay workers or detector threads behind on
+    # reload/shutdown
+    counterfactual_service.shutdown()
+    scoring_service.shutdown()
+    temporal_service.shutdown()
 
 
 app = FastAPI(
@@ -16,6 +25,7 @@ app = FastAPI(
     description="AI-powered trading bias detection and coaching platform",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
@@ -1,6 +1,7 @@
 """Analysis router – trigger full bias analysis and retrieve results."""
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 import pandas as pd
@@ -9,7 +10,7 @@ import json
 from app.database import get_db
 from app.models import AnalysisSession, BiasResult, Trade
 from app.schemas import AnalysisResponse, BiasScoreOut, ArchetypeOut
-from app.services.scoring import run_full_analysis
+from app.services.scoring import remember_featured, run_full_analysis
 
 router = APIRouter()
 
@@ -54,6 +55,7 @@ async def run_analysis(session_id: str, db: AsyncSession = Depends(get_db)):
 
     df = await _load_trades_df(db, session_id)
     results = run_full_analysis(df)
+    remember_featured(session_id, results["featured_df"])
 
     # Persist bias results
     existing = await db.execute(
@@ -97,7 +99,9 @@ async def run_analysis(session_id: str, db: AsyncSession = Depends(get_db)):
 
     await db.commit()
 
-    return {
+    # Returned as-is: the curve arrays are numpy, which orjson dumps natively
+    # but jsonable_encoder would choke on.
+    return ORJSONResponse({
         "session_id": session_id,
         "trade_count": len(df),
         "overtrading": results["overtrading"],
@@ -112,7 +116,7 @@ async def run_analysis(session_id: str, db: AsyncSession = Depends(get_db)):
         "trade_frequency": results["trade_frequency"],
         "holding_time_comparison": results["holding_time_comparison"],
         "position_scatter": results["position_scatter"],
-    }
+    })
 
 
 @router.get("/analysis/{session_id}")
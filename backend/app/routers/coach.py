@@ -1,13 +1,15 @@
 """AI Trading Coach router."""
 
+import orjson
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import async_session, get_db
 from app.models import BiasResult
 from app.schemas import CoachRequest
-from app.services.coach import generate_coaching
+from app.services.coach import generate_coaching, generate_coaching_stream
 
 router = APIRouter()
 
@@ -19,7 +21,63 @@ async def get_coaching(
     db: AsyncSession = Depends(get_db),
 ):
     """Generate AI coaching based on analysis results."""
-    # Load bias results
+    bias = await _load_bias_result(db, session_id)
+    analysis = _build_analysis(bias)
+
+    coaching = await generate_coaching(analysis, provider_override=body.provider)
+
+    # Cache coaching output
+    bias.coach_output = coaching
+    await db.commit()
+
+    return {
+        "session_id": session_id,
+        **coaching,
+    }
+
+
+@router.post("/coach/{session_id}/stream")
+async def stream_coaching(
+    session_id: str,
+    body: CoachRequest = CoachRequest(),
+    db: AsyncSession = Depends(get_db),
+):
+    """Stream AI coaching as server-sent events.
+
+    Emits ``delta`` events with feedback prose as it is generated, then a
+    ``done`` event carrying the full coaching payload.
+    """
+    bias = await _load_bias_result(db, session_id)
+    analysis = _build_analysis(bias)
+
+    async def events():
+        coaching = None
+        async for event in generate_coaching_stream(analysis, provider_override=body.provider):
+            if event["type"] == "done":
+                coaching = event["result"]
+                payload = {"session_id": session_id, **coaching}
+            else:
+                payload = {"text": event["text"]}
+            yield b"event: " + event["type"].encode() + b"\ndata: " + orjson.dumps(payload) + b"\n\n"
+
+        # The request-scoped session is closed once streaming starts, so
+        # cache the coaching output with a fresh one.
+        if coaching is not None:
+            async with async_session() as cache_db:
+                cached = await cache_db.get(BiasResult, bias.id)
+                if cached is not None:
+                    cached.coach_output = coaching
+                    await cache_db.commit()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _load_bias_result(db: AsyncSession, session_id: str) -> BiasResult:
+    """Load the stored bias results for a session or 404."""
     result = await db.execute(
         select(BiasResult).where(BiasResult.session_id == session_id)
     )
@@ -29,8 +87,12 @@ async def get_coaching(
             status_code=404,
             detail="Analysis not found. Run POST /api/analysis/{session_id} first.",
         )
+    return bias
 
-    analysis = {
+
+def _build_analysis(bias: BiasResult) -> dict:
+    """Assemble the analysis dict the coach expects from stored bias results."""
+    return {
         "overtrading": {
             "score": bias.overtrading_score,
             "band": _band(bias.overtrading_score),
@@ -63,17 +125,6 @@ async def get_coaching(
         "feature_summary": bias.feature_summary or {},
     }
 
-    coaching = await generate_coaching(analysis, provider_override=body.provider)
-
-    # Cache coaching output
-    bias.coach_output = coaching
-    await db.commit()
-
-    return {
-        "session_id": session_id,
-        **coaching,
-    }
-
 
 def _band(score: float) -> str:
     if score < 30:
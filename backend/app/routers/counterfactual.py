@@ -3,6 +3,7 @@
 import logging
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 import pandas as pd
@@ -11,7 +12,8 @@ from app.database import get_db
 from app.models import AnalysisSession, Trade
 from app.schemas import CounterfactualRequest, CounterfactualResponse
 from app.services.features import compute_trade_features
-from app.services.counterfactual import simulate
+from app.services.counterfactual import simulate_async
+from app.services.scoring import get_featured, remember_featured
 
 logger = logging.getLogger(__name__)
 
@@ -34,34 +36,38 @@ async def run_counterfactual(
     if not sess_result.scalar_one_or_none():
         raise HTTPException(status_code=404, detail="Session not found")
 
-    # Load trades
-    result = await db.execute(
-        select(Trade)
-        .where(Trade.session_id == session_id)
-        .order_by(Trade.timestamp)
-    )
-    trades = result.scalars().all()
-    if not trades:
-        raise HTTPException(status_code=404, detail="No trades found")
+    # Reuse the featured trades from the analysis run when still cached
+    df = get_featured(session_id)
+    if df is None:
+        # Load trades
+        result = await db.execute(
+            select(Trade)
+            .where(Trade.session_id == session_id)
+            .order_by(Trade.timestamp)
+        )
+        trades = result.scalars().all()
+        if not trades:
+            raise HTTPException(status_code=404, detail="No trades found")
 
-    records = [
-        {
-            "timestamp": t.timestamp,
-            "asset": t.asset,
-            "side": t.side,
-            "quantity": t.quantity,
-            "entry_price": t.entry_price,
-            "exit_price": t.exit_price,
-            "profit_loss": t.profit_loss,
-            "balance": t.balance,
-        }
-        for t in trades
-    ]
-    df = pd.DataFrame(records)
-    df = compute_trade_features(df)
-    logger.info("Loaded %d trades for session %s", len(df), session_id)
+        records = [
+            {
+                "timestamp": t.timestamp,
+                "asset": t.asset,
+                "side": t.side,
+                "quantity": t.quantity,
+                "entry_price": t.entry_price,
+                "exit_price": t.exit_price,
+                "profit_loss": t.profit_loss,
+                "balance": t.balance,
+            }
+            for t in trades
+        ]
+        df = pd.DataFrame(records)
+        df = compute_trade_features(df)
+        remember_featured(session_id, df)
+        logger.info("Loaded %d trades for session %s", len(df), session_id)
 
-    sim_result = simulate(
+    sim_result = await simulate_async(
         df,
         max_position_pct=params.max_position_pct,
         stop_loss_pct=params.stop_loss_pct,
@@ -71,8 +77,9 @@ async def run_counterfactual(
         max_drawdown_trigger_pct=params.max_drawdown_trigger_pct,
     )
 
-    return {
+    # Bypass response_model validation so the curve arrays go straight to orjson.
+    return ORJSONResponse({
         "session_id": session_id,
         "params": params.model_dump(),
         **sim_result,
-    }
+    })
@@ -45,7 +45,7 @@ class AnalysisResponse(BaseModel):
     archetype: ArchetypeOut
     feature_summary: dict
     bias_timeline: List[dict]
-    equity_curve: List[dict]
+    equity_curve: dict
     trade_frequency: dict
     holding_time_comparison: dict
     position_scatter: List[dict]
@@ -68,8 +68,8 @@ class CounterfactualResponse(BaseModel):
     simulated: dict
     improvement: dict
     summary: str
-    equity_curve_original: List[dict]
-    equity_curve_simulated: List[dict]
+    equity_curve_original: dict
+    equity_curve_simulated: dict
     trades_original: int
     trades_simulated: int
     excluded_breakdown: dict
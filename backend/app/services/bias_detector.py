@@ -7,6 +7,7 @@ clear differentiation between healthy and problematic behaviour.
 
 import numpy as np
 import pandas as pd
+from numba import njit
 from scipy import stats
 
 from app.utils import clamp
@@ -329,56 +330,100 @@ def detect_revenge_trading(df: pd.DataFrame) -> tuple[float, dict]:
 # Anchoring Bias
 # ──────────────────────────────────────────────────────────────────────────────
 
+@njit(cache=True)
+def _anchoring_rates(exit_entry_ratio, exit_round_offset, abs_pnl, los, his):
+    """Per-window (anchor exit %, near-zero PnL %, round-number exit %)."""
+    out = np.zeros((len(los), 3))
+    for w in range(len(los)):
+        lo, hi = los[w], his[w]
+        n = hi - lo
+        if n <= 0:
+            continue
+        anchored = 0
+        rounded = 0
+        for i in range(lo, hi):
+            if exit_entry_ratio[i] < 0.001:
+                anchored += 1
+            if exit_round_offset[i] < 0.01:
+                rounded += 1
+        near_zero = 0
+        median = np.nanmedian(abs_pnl[lo:hi])
+        if median > 0:
+            cutoff = median * 0.05
+            for i in range(lo, hi):
+                if abs_pnl[i] < cutoff:
+                    near_zero += 1
+        out[w, 0] = anchored / n * 100
+        out[w, 1] = near_zero / n * 100
+        out[w, 2] = rounded / n * 100
+    return out
+
+
+def _anchoring_inputs(df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Row-level anchoring signals (precomputed by compute_trade_features when present)."""
+    if "exit_entry_ratio" in df.columns:
+        exit_entry_ratio = df["exit_entry_ratio"]
+    else:
+        exit_entry_ratio = (df["exit_price"] / df["entry_price"] - 1).abs()
+    if "exit_round_offset" in df.columns:
+        exit_round_offset = df["exit_round_offset"]
+    else:
+        exit_round_offset = (df["exit_price"] - df["exit_price"].round(0)).abs()
+    return (
+        exit_entry_ratio.to_numpy(dtype=np.float64),
+        exit_round_offset.to_numpy(dtype=np.float64),
+        df["profit_loss"].abs().to_numpy(dtype=np.float64),
+    )
+
+
+def _anchoring_composite(anchor_rate: float, zero_cluster_rate: float, round_number_rate: float) -> tuple[float, dict]:
+    """Weighted anchoring score and its sub-scores from the three rates."""
+    anchor_score = clamp(anchor_rate * 2.5, 0, 100)
+    cluster_score = clamp(zero_cluster_rate * 2.0, 0, 100)
+    round_score = clamp(round_number_rate * 1, 0, 100)
+    composite = 0.40 * anchor_score + 0.35 * cluster_score + 0.25 * round_score
+    return round(clamp(composite), 1), {
+        "anchor_exit": round(anchor_score, 1),
+        "zero_clustering": round(cluster_score, 1),
+        "round_number": round(round_score, 1),
+    }
+
+
+def anchoring_window_scores(df: pd.DataFrame, los: np.ndarray, his: np.ndarray) -> np.ndarray:
+    """Anchoring score for every row window [los[i], his[i]) of a sorted frame, in one pass."""
+    rates = _anchoring_rates(
+        *_anchoring_inputs(df),
+        np.asarray(los, dtype=np.int64),
+        np.asarray(his, dtype=np.int64),
+    )
+    return np.array([_anchoring_composite(*r)[0] for r in rates])
+
+
 def detect_anchoring(df: pd.DataFrame) -> tuple[float, dict]:
     """Score 0-100 for anchoring bias.
 
     Anchoring occurs when traders fixate on reference points (entry price,
     recent high/low) and make irrational decisions based on these anchors.
-    """
-    details: dict = {}
 
+    Signals:
+    - Exits within 0.1% of the entry price
+    - PnL clustering around zero (reluctance to take small losses/gains)
+    - Round number fixation (exits at prices ending in .00)
+    """
     if len(df) < 10:
         return 0.0, {"reason": "insufficient_data"}
 
-    # 1. Exit price proximity to entry (reluctance to exit near entry = anchoring)
-    df_copy = df.copy()
-    df_copy["exit_entry_ratio"] = abs(df_copy["exit_price"] / df_copy["entry_price"] - 1)
-
-    # Count trades exited within 0.1% of entry price
-    anchored_exits = (df_copy["exit_entry_ratio"] < 0.001).sum()
-    anchor_rate = anchored_exits / len(df_copy) * 100
-    details["anchor_exit_rate_pct"] = round(float(anchor_rate), 2)
-
-    anchor_score = clamp(anchor_rate * 2.5, 0, 100)
-
-    # 2. Profit/loss clustering around zero (reluctance to take small losses/gains)
-    pnl_median = abs(df["profit_loss"]).median()
-    if pnl_median > 0:
-        pnl_near_zero = (abs(df["profit_loss"]) < pnl_median * 0.05).sum()
-        zero_cluster_rate = pnl_near_zero / len(df) * 100
-        details["pnl_near_zero_pct"] = round(float(zero_cluster_rate), 2)
-        cluster_score = clamp(zero_cluster_rate * 2.0, 0, 100)
-    else:
-        details["pnl_near_zero_pct"] = 0.0
-        cluster_score = 0
-
-    # 3. Round number fixation (exits at prices ending in .00, .50, etc.)
-    if "exit_price" in df.columns:
-        exit_decimals = df["exit_price"].apply(lambda x: abs(x - round(x, 0)))
-        round_number_exits = (exit_decimals < 0.01).sum()
-        round_number_rate = round_number_exits / len(df) * 100
-        details["round_number_exit_rate_pct"] = round(float(round_number_rate), 2)
-        round_score = clamp(round_number_rate * 1, 0, 100)
-    else:
-        round_score = 0
-
-    composite = 0.40 * anchor_score + 0.35 * cluster_score + 0.25 * round_score
-    details["sub_scores"] = {
-        "anchor_exit": round(anchor_score, 1),
-        "zero_clustering": round(cluster_score, 1),
-        "round_number": round(round_score, 1),
+    [[anchor_rate, zero_cluster_rate, round_number_rate]] = _anchoring_rates(
+        *_anchoring_inputs(df), np.array([0]), np.array([len(df)])
+    )
+    score, sub_scores = _anchoring_composite(anchor_rate, zero_cluster_rate, round_number_rate)
+    details = {
+        "anchor_exit_rate_pct": round(float(anchor_rate), 2),
+        "pnl_near_zero_pct": round(float(zero_cluster_rate), 2),
+        "round_number_exit_rate_pct": round(float(round_number_rate), 2),
+        "sub_scores": sub_scores,
     }
-    return round(clamp(composite), 1), details
+    return score, details
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -1,10 +1,35 @@
 """AI Trading Coach – multi-provider (OpenAI / Anthropic / Gemini / Groq) LLM integration."""
 
+import asyncio
+import functools
 import json
-from typing import Optional
+import re
+from typing import AsyncIterator, Optional
+
+import numpy as np
+import orjson
+from tenacity import (
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    stop_after_delay,
+    wait_random_exponential,
+)
 
 from app.config import settings
 
+# Ceiling on a single provider attempt; a full 2000-token reply needs
+# headroom. Timed-out attempts are retried like other transient errors.
+LLM_TIMEOUT_SECS = 60.0
+
+# Ceiling on a whole retried call, backoff included. Kept under the
+# frontend's 120 s request timeout so the template fallback still reaches
+# the client.
+LLM_TOTAL_TIMEOUT_SECS = 90.0
+
+# Longest a stream may go without a chunk (the first one included).
+LLM_STREAM_IDLE_SECS = 30.0
+
 SYSTEM_PROMPT = """You are an expert trading psychologist and behavioural finance coach.
 You receive quantified bias analysis data from a trader's real performance.
 Your job is to provide actionable, empathetic, and specific coaching.
@@ -23,45 +48,81 @@ RULES:
 """
 
 
-def _build_user_prompt(analysis: dict) -> str:
-    """Build the user prompt from analysis results."""
-    ot = analysis.get("overtrading", {})
-    la = analysis.get("loss_aversion", {})
-    rt = analysis.get("revenge_trading", {})
-    an = analysis.get("anchoring", {})
-    oc = analysis.get("overconfidence", {})
-    arch = analysis.get("archetype", {})
-    summary = analysis.get("feature_summary", {})
-
-    return f"""Here is the trader's analysis:
+_USER_PROMPT_TEMPLATE = """Here is the trader's analysis:
 
 ## Performance Summary
-- Total trades: {summary.get('total_trades', 'N/A')}
-- Win rate: {summary.get('win_rate', 'N/A')}%
-- Average win: ${summary.get('avg_win', 'N/A')}
-- Average loss: ${summary.get('avg_loss', 'N/A')}
-- Sharpe ratio: {summary.get('sharpe_ratio', 'N/A')}
-- Max drawdown: {summary.get('max_drawdown_pct', 'N/A')}%
-- Trades per hour: {summary.get('trades_per_hour', 'N/A')}
+- Total trades: {total_trades}
+- Win rate: {win_rate}%
+- Average win: ${avg_win}
+- Average loss: ${avg_loss}
+- Sharpe ratio: {sharpe_ratio}
+- Max drawdown: {max_drawdown_pct}%
+- Trades per hour: {trades_per_hour}
 
 ## Bias Scores (0-100, higher = worse)
-- Overtrading: {ot.get('score', 'N/A')}/100 ({ot.get('band', 'N/A')})
-  Details: {json.dumps(ot.get('details', {}), default=str)}
-- Loss Aversion: {la.get('score', 'N/A')}/100 ({la.get('band', 'N/A')})
-  Details: {json.dumps(la.get('details', {}), default=str)}
-- Revenge Trading: {rt.get('score', 'N/A')}/100 ({rt.get('band', 'N/A')})
-  Details: {json.dumps(rt.get('details', {}), default=str)}
-- Anchoring: {an.get('score', 'N/A')}/100 ({an.get('band', 'N/A')})
-  Details: {json.dumps(an.get('details', {}), default=str)}
-- Overconfidence: {oc.get('score', 'N/A')}/100 ({oc.get('band', 'N/A')})
-  Details: {json.dumps(oc.get('details', {}), default=str)}
+- Overtrading: {ot_score}/100 ({ot_band})
+  Details: {ot_details}
+- Loss Aversion: {la_score}/100 ({la_band})
+  Details: {la_details}
+- Revenge Trading: {rt_score}/100 ({rt_band})
+  Details: {rt_details}
+- Anchoring: {an_score}/100 ({an_band})
+  Details: {an_details}
+- Overconfidence: {oc_score}/100 ({oc_band})
+  Details: {oc_details}
 
 ## Trader Archetype
-{arch.get('label', 'Unknown')}: {arch.get('details', {}).get('description', '')}
+{archetype_label}: {archetype_description}
 
 Provide your coaching response as JSON.
 """
 
+_PROMPT_BIASES = (
+    ("ot", "overtrading"),
+    ("la", "loss_aversion"),
+    ("rt", "revenge_trading"),
+    ("an", "anchoring"),
+    ("oc", "overconfidence"),
+)
+
+_PROMPT_SUMMARY_KEYS = (
+    "total_trades", "win_rate", "avg_win", "avg_loss",
+    "sharpe_ratio", "max_drawdown_pct", "trades_per_hour",
+)
+
+
+def _json_default(obj):
+    """Numpy scalars as plain numbers/bools; anything else as its str()."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return str(obj)
+
+
+def _dumps(obj) -> str:
+    """Compact JSON for bias detail dicts embedded in the prompt."""
+    return orjson.dumps(
+        obj,
+        default=_json_default,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+    ).decode()
+
+
+def _build_user_prompt(analysis: dict) -> str:
+    """Build the user prompt from analysis results."""
+    summary = analysis.get("feature_summary", {})
+    arch = analysis.get("archetype", {})
+
+    params = {key: summary.get(key, "N/A") for key in _PROMPT_SUMMARY_KEYS}
+    for prefix, name in _PROMPT_BIASES:
+        bias = analysis.get(name, {})
+        params[f"{prefix}_score"] = bias.get("score", "N/A")
+        params[f"{prefix}_band"] = bias.get("band", "N/A")
+        params[f"{prefix}_details"] = _dumps(bias.get("details", {}))
+    params["archetype_label"] = arch.get("label", "Unknown")
+    params["archetype_description"] = arch.get("details", {}).get("description", "")
+
+    return _USER_PROMPT_TEMPLATE.format_map(params)
+
 
 def _generate_fallback(analysis: dict) -> dict:
     """Template-based coaching when LLM is unavailable."""
@@ -176,6 +237,47 @@ def _generate_fallback(analysis: dict) -> dict:
     }
 
 
+def _is_retryable(exc: BaseException) -> bool:
+    """True for transient provider errors: rate limits, 5xx, dropped connections.
+
+    Auth and other 4xx errors are not retried so we fail over to the
+    template response quickly.
+    """
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(exc, "code", None)  # google-genai APIError
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    return type(exc).__name__ in ("APIConnectionError", "APITimeoutError") or isinstance(
+        exc, (ConnectionError, asyncio.TimeoutError)
+    )
+
+
+_retry_policy = retry(
+    retry=retry_if_exception(_is_retryable),
+    stop=stop_after_attempt(3) | stop_after_delay(LLM_TOTAL_TIMEOUT_SECS),
+    wait=wait_random_exponential(min=0.2, max=2.0),
+    reraise=True,
+)
+
+
+def _llm_retry(fn):
+    """Retry transient provider errors, bounding each attempt by LLM_TIMEOUT_SECS
+    and the whole call by LLM_TOTAL_TIMEOUT_SECS."""
+
+    @functools.wraps(fn)
+    async def attempt(*args, **kwargs):
+        return await asyncio.wait_for(fn(*args, **kwargs), timeout=LLM_TIMEOUT_SECS)
+
+    retried = _retry_policy(attempt)
+
+    @functools.wraps(fn)
+    async def call(*args, **kwargs):
+        return await asyncio.wait_for(retried(*args, **kwargs), timeout=LLM_TOTAL_TIMEOUT_SECS)
+
+    return call
+
+
 def _has_valid_key(key: str) -> bool:
     """Check if an API key looks real (not a placeholder)."""
     return bool(key) and len(key) >= 10 and "your" not in key.lower()
@@ -222,25 +324,42 @@ async def generate_coaching(
 
     user_prompt = _build_user_prompt(analysis)
 
+    if provider == "groq":
+        call = _call_groq
+    elif provider == "anthropic":
+        call = _call_anthropic
+    elif provider == "gemini":
+        call = _call_gemini
+    else:
+        call = _call_openai
+
     try:
-        if provider == "groq":
-            return await _call_groq(user_prompt)
-        elif provider == "anthropic":
-            return await _call_anthropic(user_prompt)
-        elif provider == "gemini":
-            return await _call_gemini(user_prompt)
-        else:
-            return await _call_openai(user_prompt)
+        return await call(user_prompt)
     except Exception:
         # LLM failed — gracefully degrade to template
         return _generate_fallback(analysis)
 
 
+def _parse_content(provider: str, content: str) -> dict:
+    """Parse the model's JSON reply; fall back to treating it as plain feedback."""
+    try:
+        return {"provider": provider, **json.loads(content)}
+    except json.JSONDecodeError:
+        return {
+            "provider": provider,
+            "feedback": content,
+            "discipline_plan": [],
+            "daily_checklist": [],
+            "journaling_prompts": [],
+        }
+
+
+@_llm_retry
 async def _call_openai(user_prompt: str) -> dict:
     """Call OpenAI API."""
     from openai import AsyncOpenAI
 
-    client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+    client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, max_retries=0)
     response = await client.chat.completions.create(
         model="gpt-4o",
         messages=[
@@ -252,23 +371,15 @@ async def _call_openai(user_prompt: str) -> dict:
         response_format={"type": "json_object"},
     )
     content = response.choices[0].message.content
-    try:
-        return {"provider": "openai", **json.loads(content)}
-    except json.JSONDecodeError:
-        return {
-            "provider": "openai",
-            "feedback": content,
-            "discipline_plan": [],
-            "daily_checklist": [],
-            "journaling_prompts": [],
-        }
+    return _parse_content("openai", content)
 
 
+@_llm_retry
 async def _call_anthropic(user_prompt: str) -> dict:
     """Call Anthropic API."""
     from anthropic import AsyncAnthropic
 
-    client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
+    client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY, max_retries=0)
     response = await client.messages.create(
         model="claude-sonnet-4-20250514",
         max_tokens=2000,
@@ -276,18 +387,10 @@ async def _call_anthropic(user_prompt: str) -> dict:
         messages=[{"role": "user", "content": user_prompt}],
     )
     content = response.content[0].text
-    try:
-        return {"provider": "anthropic", **json.loads(content)}
-    except json.JSONDecodeError:
-        return {
-            "provider": "anthropic",
-            "feedback": content,
-            "discipline_plan": [],
-            "daily_checklist": [],
-            "journaling_prompts": [],
-        }
+    return _parse_content("anthropic", content)
 
 
+@_llm_retry
 async def _call_gemini(user_prompt: str) -> dict:
     """Call Google Gemini API."""
     from google import genai
@@ -304,23 +407,15 @@ async def _call_gemini(user_prompt: str) -> dict:
         },
     )
     content = response.text
-    try:
-        return {"provider": "gemini", **json.loads(content)}
-    except json.JSONDecodeError:
-        return {
-            "provider": "gemini",
-            "feedback": content,
-            "discipline_plan": [],
-            "daily_checklist": [],
-            "journaling_prompts": [],
-        }
+    return _parse_content("gemini", content)
 
 
+@_llm_retry
 async def _call_groq(user_prompt: str) -> dict:
     """Call Groq API (Llama 3.3 70B)."""
     from groq import AsyncGroq
 
-    client = AsyncGroq(api_key=settings.GROQ_API_KEY)
+    client = AsyncGroq(api_key=settings.GROQ_API_KEY, max_retries=0)
     response = await client.chat.completions.create(
         model="llama-3.3-70b-versatile",
         messages=[
@@ -332,13 +427,216 @@ async def _call_groq(user_prompt: str) -> dict:
         response_format={"type": "json_object"},
     )
     content = response.choices[0].message.content
+    return _parse_content("groq", content)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Streaming
+# ──────────────────────────────────────────────────────────────────────────────
+
+_JSON_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class _FeedbackExtractor:
+    """Incrementally decode the "feedback" string out of a streaming JSON reply.
+
+    Tokens are fed as they arrive; ``feed`` returns whatever new feedback
+    prose can be decoded so far.  The full raw text is kept in ``text`` so
+    the complete reply can be parsed once the stream ends.
+    """
+
+    _KEY = re.compile(r'"feedback"\s*:\s*"')
+
+    def __init__(self) -> None:
+        self.text = ""
+        self._pos: int | None = None
+        self._done = False
+
+    def feed(self, chunk: str) -> str:
+        self.text += chunk
+        if self._done:
+            return ""
+        if self._pos is None:
+            match = self._KEY.search(self.text)
+            if match is None:
+                return ""
+            self._pos = match.end()
+
+        buf, i, out = self.text, self._pos, []
+        while i < len(buf):
+            ch = buf[i]
+            if ch == '"':
+                self._done = True
+                i += 1
+                break
+            if ch != "\\":
+                out.append(ch)
+                i += 1
+                continue
+            if i + 1 >= len(buf):
+                break  # escape split across chunks
+            esc = buf[i + 1]
+            if esc != "u":
+                out.append(_JSON_ESCAPES.get(esc, esc))
+                i += 2
+                continue
+            if i + 6 > len(buf):
+                break
+            code = int(buf[i + 2 : i + 6], 16)
+            if 0xD800 <= code < 0xDC00:  # surrogate pair: need the low half too
+                if i + 12 > len(buf):
+                    break
+                low = int(buf[i + 8 : i + 12], 16)
+                code = 0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)
+                i += 12
+            else:
+                i += 6
+            out.append(chr(code))
+        self._pos = i
+        return "".join(out)
+
+
+async def generate_coaching_stream(
+    analysis: dict,
+    provider_override: Optional[str] = None,
+) -> AsyncIterator[dict]:
+    """Stream AI coaching as it is generated.
+
+    Yields ``{"type": "delta", "text": ...}`` events carrying the feedback
+    prose as soon as it can be decoded, then a single
+    ``{"type": "done", "result": {...}}`` event with the full parsed
+    coaching dict (same shape as ``generate_coaching``).  Falls back to the
+    template response if no provider is configured or the stream fails.
+    """
+    preferred = provider_override or settings.LLM_PROVIDER
+    provider = _pick_provider(preferred)
+
+    if provider is None:
+        yield {"type": "done", "result": _generate_fallback(analysis)}
+        return
+
+    user_prompt = _build_user_prompt(analysis)
+    if provider == "groq":
+        open_stream = _stream_groq
+    elif provider == "anthropic":
+        open_stream = _stream_anthropic
+    elif provider == "gemini":
+        open_stream = _stream_gemini
+    else:
+        open_stream = _stream_openai
+
+    extractor = _FeedbackExtractor()
+    stream = None
     try:
-        return {"provider": "groq", **json.loads(content)}
-    except json.JSONDecodeError:
-        return {
-            "provider": "groq",
-            "feedback": content,
-            "discipline_plan": [],
-            "daily_checklist": [],
-            "journaling_prompts": [],
-        }
+        chunk, stream = await _open_stream(open_stream, user_prompt)
+        while True:
+            text = extractor.feed(chunk)
+            if text:
+                yield {"type": "delta", "text": text}
+            try:
+                chunk = await asyncio.wait_for(stream.__anext__(), timeout=LLM_STREAM_IDLE_SECS)
+            except StopAsyncIteration:
+                break
+    except Exception:
+        # LLM failed or stalled — the done event replaces any partial text
+        yield {"type": "done", "result": _generate_fallback(analysis)}
+        return
+    finally:
+        if stream is not None:
+            await stream.aclose()
+
+    yield {"type": "done", "result": _parse_content(provider, extractor.text)}
+
+
+@_llm_retry
+async def _open_stream(open_stream, user_prompt: str) -> tuple[str, AsyncIterator[str]]:
+    """Start a provider stream and wait for its first chunk.
+
+    Failures before any text arrives are retried like a non-streaming call;
+    once text has gone out to the client the stream cannot be replayed.
+    """
+    stream = open_stream(user_prompt)
+    try:
+        first = await asyncio.wait_for(stream.__anext__(), timeout=LLM_STREAM_IDLE_SECS)
+    except StopAsyncIteration:
+        first = ""
+    except BaseException:
+        await stream.aclose()
+        raise
+    return first, stream
+
+
+async def _stream_openai(user_prompt: str) -> AsyncIterator[str]:
+    """Stream tokens from OpenAI."""
+    from openai import AsyncOpenAI
+
+    client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, max_retries=0)
+    stream = await client.chat.completions.create(
+        model="gpt-4o",
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt},
+        ],
+        temperature=0.7,
+        max_tokens=2000,
+        response_format={"type": "json_object"},
+        stream=True,
+    )
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+async def _stream_anthropic(user_prompt: str) -> AsyncIterator[str]:
+    """Stream tokens from Anthropic."""
+    from anthropic import AsyncAnthropic
+
+    client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY, max_retries=0)
+    async with client.messages.stream(
+        model="claude-sonnet-4-20250514",
+        max_tokens=2000,
+        system=SYSTEM_PROMPT,
+        messages=[{"role": "user", "content": user_prompt}],
+    ) as stream:
+        async for text in stream.text_stream:
+            yield text
+
+
+async def _stream_gemini(user_prompt: str) -> AsyncIterator[str]:
+    """Stream tokens from Google Gemini."""
+    from google import genai
+
+    client = genai.Client(api_key=settings.GEMINI_API_KEY)
+    stream = await client.aio.models.generate_content_stream(
+        model="gemini-2.0-flash-exp",
+        contents=f"{SYSTEM_PROMPT}\n\n{user_prompt}",
+        config={
+            "response_mime_type": "application/json",
+            "temperature": 0.7,
+            "max_output_tokens": 2000,
+        },
+    )
+    async for chunk in stream:
+        if chunk.text:
+            yield chunk.text
+
+
+async def _stream_groq(user_prompt: str) -> AsyncIterator[str]:
+    """Stream tokens from Groq (Llama 3.3 70B)."""
+    from groq import AsyncGroq
+
+    client = AsyncGroq(api_key=settings.GROQ_API_KEY, max_retries=0)
+    stream = await client.chat.completions.create(
+        model="llama-3.3-70b-versatile",
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt},
+        ],
+        temperature=0.7,
+        max_tokens=2000,
+        response_format={"type": "json_object"},
+        stream=True,
+    )
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
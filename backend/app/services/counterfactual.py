@@ -1,13 +1,43 @@
 """Counterfactual simulator – replay trade history under constraints."""
 
+import asyncio
+import functools
 import logging
+import multiprocessing
+import os
 import time
+from concurrent.futures import ProcessPoolExecutor
 
 import numpy as np
 import pandas as pd
+from numba import njit
+
+__all__ = ["simulate", "simulate_async", "shutdown"]
+
+_INT64_MAX = np.iinfo(np.int64).max
 
 logger = logging.getLogger(__name__)
 
+# Replays are CPU-bound; run them in worker processes so they neither block
+# the event loop nor contend for the GIL.  "spawn" avoids forking a process
+# that already has a running event loop and DB connections.
+_executor = ProcessPoolExecutor(
+    max_workers=os.cpu_count(),
+    mp_context=multiprocessing.get_context("spawn"),
+)
+
+
+# Every column simulate() reads; simulate_async ships only these to the
+# worker process.  Keep in sync with the function body below.
+_SIM_COLS = [
+    "timestamp",
+    "profit_loss",
+    "balance",
+    "position_size_pct",
+    "streak_index",
+    "drawdown_at_trade",
+]
+
 
 def simulate(
     df: pd.DataFrame,
@@ -33,118 +63,99 @@ def simulate(
     Returns dict with original metrics, simulated metrics, improvement,
     equity curves, and excluded_breakdown.
     """
-    t0 = time.perf_counter()
-    logger.info(
-        "Counterfactual simulation started | trades=%d position_cap=%s stop_loss=%s "
-        "daily_limit=%s cooldown=%s loss_streak=%s drawdown_trigger=%s",
-        len(df), max_position_pct, stop_loss_pct, max_daily_trades,
-        cooldown_minutes, max_loss_streak, max_drawdown_trigger_pct,
-    )
-
-    sim = df.copy()
-    sim["included"] = True
-    sim["excluded_by"] = None
+    # Work on plain arrays; only profit_loss is ever rewritten, so the
+    # input frame is neither copied nor mutated.
+    n = len(df)
+    keep = np.ones(n, dtype=bool)
+    pnl = df["profit_loss"].to_numpy(dtype=np.float64, copy=True)
 
     breakdown: dict[str, int] = {}
 
     # ── 1. Max daily trades ────────────────────────────────────────
     if max_daily_trades is not None:
-        sim["trade_date"] = sim["timestamp"].dt.date
-        sim["daily_rank"] = sim.groupby("trade_date").cumcount() + 1
-        mask = sim["included"] & (sim["daily_rank"] > max_daily_trades)
-        sim.loc[mask, "included"] = False
-        sim.loc[mask, "excluded_by"] = "daily_limit"
+        # Trades are time-sorted, so each day is a contiguous run: rank is
+        # the offset from the start of the run the trade falls in.  Days are
+        # calendar days in the trades' own timezone, not UTC.
+        ts = df["timestamp"]
+        if ts.dt.tz is not None:
+            ts = ts.dt.tz_localize(None)
+        days = ts.to_numpy(dtype="datetime64[D]")
+        starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+        run_lengths = np.diff(np.r_[starts, len(days)])
+        daily_rank = np.arange(len(days)) - np.repeat(starts, run_lengths) + 1
+        mask = keep & (daily_rank > max_daily_trades)
+        keep[mask] = False
         breakdown["daily_limit"] = int(mask.sum())
 
     # ── 2. Cooldown period ─────────────────────────────────────────
     if cooldown_minutes is not None:
-        cooldown_sec = cooldown_minutes * 60
-        last_allowed = pd.NaT
-        cooldown_count = 0
-        for i in sim.index:
-            if not sim.at[i, "included"]:
-                continue
-            if last_allowed is not pd.NaT and (sim.at[i, "timestamp"] - last_allowed).total_seconds() < cooldown_sec:
-                sim.at[i, "included"] = False
-                sim.at[i, "excluded_by"] = "cooldown"
-                cooldown_count += 1
-            else:
-                last_allowed = sim.at[i, "timestamp"]
-        breakdown["cooldown"] = cooldown_count
+        cooldown_ns = min(int(cooldown_minutes * 60 * 1_000_000_000), _INT64_MAX)
+        ts_ns = df["timestamp"].to_numpy(dtype="datetime64[ns]").view("int64")
+        breakdown["cooldown"] = _apply_cooldown(ts_ns, keep, cooldown_ns)
 
     # ── 3. Loss-streak breaker ─────────────────────────────────────
-    if max_loss_streak is not None and "streak_index" in sim.columns:
-        mask = sim["included"] & (sim["streak_index"] <= -max_loss_streak)
-        sim.loc[mask, "included"] = False
-        sim.loc[mask, "excluded_by"] = "loss_streak"
+    if max_loss_streak is not None and "streak_index" in df.columns:
+        mask = keep & (df["streak_index"].to_numpy() <= -max_loss_streak)
+        keep[mask] = False
         breakdown["loss_streak"] = int(mask.sum())
 
     # ── 4. Drawdown circuit breaker ────────────────────────────────
-    if max_drawdown_trigger_pct is not None and "drawdown_at_trade" in sim.columns:
-        mask = sim["included"] & (sim["drawdown_at_trade"] < -max_drawdown_trigger_pct)
-        sim.loc[mask, "included"] = False
-        sim.loc[mask, "excluded_by"] = "drawdown_breaker"
+    if max_drawdown_trigger_pct is not None and "drawdown_at_trade" in df.columns:
+        mask = keep & (df["drawdown_at_trade"].to_numpy() < -max_drawdown_trigger_pct)
+        keep[mask] = False
         breakdown["drawdown_breaker"] = int(mask.sum())
 
     # ── 5. Cap position size ───────────────────────────────────────
     if max_position_pct is not None:
-        mask = sim["included"] & (sim["position_size_pct"] > max_position_pct)
+        position_pct = df["position_size_pct"].to_numpy(dtype=np.float64)
+        mask = keep & (position_pct > max_position_pct)
         if mask.any():
-            scale = max_position_pct / sim.loc[mask, "position_size_pct"]
-            sim.loc[mask, "profit_loss"] = sim.loc[mask, "profit_loss"] * scale
-            sim.loc[mask, "quantity"] = sim.loc[mask, "quantity"] * scale
-            sim.loc[mask, "position_size_pct"] = max_position_pct
+            pnl[mask] *= max_position_pct / position_pct[mask]
             breakdown["position_cap_scaled"] = int(mask.sum())
 
     # ── 6. Stop-loss (uses running simulated balance) ──────────────
     start_bal = df["balance"].iloc[0] - df["profit_loss"].iloc[0]
     if stop_loss_pct is not None:
-        running_bal = start_bal
-        sl_count = 0
-        for i in sim.index:
-            if not sim.at[i, "included"]:
-                continue
-            if running_bal != 0:
-                pnl = sim.at[i, "profit_loss"]
-                loss_pct = abs(pnl) / abs(running_bal) * 100
-                if pnl < 0 and loss_pct > stop_loss_pct:
-                    sim.at[i, "profit_loss"] = -abs(running_bal) * stop_loss_pct / 100
-                    sl_count += 1
-            running_bal += sim.at[i, "profit_loss"]
-        breakdown["stop_loss_capped"] = sl_count
+        breakdown["stop_loss_capped"] = _apply_stop_loss(pnl, keep, float(start_bal), float(stop_loss_pct))
 
     # Remove zero-count entries
     breakdown = {k: v for k, v in breakdown.items() if v > 0}
 
     # ── Recalculate simulated balance ──────────────────────────────
-    included = sim[sim["included"]].copy()
-    if len(included) == 0:
-        logger.warning("All %d trades excluded by constraints", len(df))
+    if not keep.any():
         return _empty_result(df, breakdown)
 
-    included["sim_balance"] = start_bal + included["profit_loss"].cumsum()
+    timestamps = df["timestamp"].to_numpy()
+    orig_pnl = df["profit_loss"].to_numpy(dtype=np.float64)
+    orig_balance = df["balance"].to_numpy(dtype=np.float64)
+
+    sim_timestamps = timestamps[keep]
+    sim_pnl = pnl[keep]
+    sim_balance = start_bal + np.nancumsum(sim_pnl)
+    sim_balance[np.isnan(sim_pnl)] = np.nan  # match Series.cumsum NaN handling
 
     # ── Compute metrics ────────────────────────────────────────────
-    orig_metrics = _compute_metrics(df, "balance")
-    sim_metrics = _compute_metrics(included, "sim_balance")
-
-    improvement = {}
-    for key in orig_metrics:
-        o = orig_metrics[key]
-        s = sim_metrics[key]
-        if isinstance(o, (int, float)) and o != 0:
-            improvement[key] = round((s - o) / abs(o) * 100, 2)
-        else:
-            improvement[key] = 0
+    orig_metrics = _compute_metrics(orig_pnl, orig_balance)
+    sim_metrics = _compute_metrics(sim_pnl, sim_balance)
+
+    improvement = {k: 0 for k in orig_metrics}
+    keys = [k for k, v in orig_metrics.items() if isinstance(v, (int, float))]
+    o = np.array([orig_metrics[k] for k in keys], dtype=np.float64)
+    s = np.array([sim_metrics[k] for k in keys], dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = np.where(o != 0, np.round((s - o) / np.abs(o) * 100, 2), 0)
+    improvement.update(zip(keys, pct.tolist()))
 
     # Equity curves (vectorized)
-    orig_curve = _build_equity_curve(df, "balance")
-    sim_curve = _build_equity_curve(included, "sim_balance")
+    orig_curve = _build_equity_curve(timestamps, orig_balance)
+    sim_curve = _build_equity_curve(sim_timestamps, sim_balance)
 
     # Extend simulated curve to match original timeline so the chart
     # doesn't stop short when late trades are excluded.
-    if sim_curve and orig_curve and sim_curve[-1]["timestamp"] < orig_curve[-1]["timestamp"]:
-        sim_curve.append({"timestamp": orig_curve[-1]["timestamp"], "balance": sim_curve[-1]["balance"]})
+    sim_ts, orig_ts = sim_curve["timestamps"], orig_curve["timestamps"]
+    if sim_ts and orig_ts and sim_ts[-1] < orig_ts[-1]:
+        sim_ts.append(orig_ts[-1])
+        sim_curve["balances"] = np.append(sim_curve["balances"], sim_curve["balances"][-1])
 
     # Summary
     parts = []
@@ -156,12 +167,6 @@ def simulate(
         parts.append(f"Sharpe ratio would change by {improvement['sharpe_ratio']:+.1f}%")
     summary = "With these constraints, " + ", ".join(parts) + "." if parts else "No significant change."
 
-    elapsed_ms = (time.perf_counter() - t0) * 1000
-    logger.info(
-        "Counterfactual simulation complete | included=%d/%d elapsed=%.1fms breakdown=%s",
-        len(included), len(df), elapsed_ms, breakdown,
-    )
-
     return {
         "original": orig_metrics,
         "simulated": sim_metrics,
@@ -170,50 +175,169 @@ def simulate(
         "equity_curve_original": orig_curve,
         "equity_curve_simulated": sim_curve,
         "trades_original": len(df),
-        "trades_simulated": len(included),
+        "trades_simulated": len(sim_pnl),
         "excluded_breakdown": breakdown,
     }
 
 
-def _compute_metrics(df: pd.DataFrame, balance_col: str) -> dict:
-    pnl = df["profit_loss"]
-    bal = df[balance_col]
-    peak = bal.cummax()
-    dd = ((bal - peak) / peak.replace(0, np.nan) * 100).fillna(0)
+async def simulate_async(df: pd.DataFrame, **constraints) -> dict:
+    """Run ``simulate`` in the worker pool without blocking the event loop.
+
+    Accepts the same keyword constraints as ``simulate``. Logging happens
+    here, in the app process: spawned workers don't inherit its logging
+    setup.
+    """
+    t0 = time.perf_counter()
+    logger.info(
+        "Counterfactual simulation started | trades=%d constraints=%s",
+        len(df), {k: v for k, v in constraints.items() if v is not None},
+    )
+
+    # Pickling the whole featured frame into the worker costs about as much
+    # as the replay itself; send only the columns simulate reads.
+    cols = [c for c in _SIM_COLS if c in df.columns]
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(_executor, functools.partial(simulate, df[cols], **constraints))
+
+    if result["trades_simulated"] == 0:
+        logger.warning("All %d trades excluded by constraints", len(df))
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+    logger.info(
+        "Counterfactual simulation complete | included=%d/%d elapsed=%.1fms breakdown=%s",
+        result["trades_simulated"], result["trades_original"], elapsed_ms, result["excluded_breakdown"],
+    )
+    return result
+
+
+def shutdown() -> None:
+    """Stop the replay worker processes, dropping any queued replays."""
+    _executor.shutdown(wait=False, cancel_futures=True)
+
+
+@njit(cache=True)
+def _apply_cooldown(ts_ns: np.ndarray, keep: np.ndarray, cooldown_ns: int) -> int:
+    """Drop kept trades within cooldown_ns of the last admitted trade.
+
+    ``ts_ns`` must be sorted (as produced by compute_trade_features).  After
+    each admitted trade a binary search finds the first trade outside its
+    cooldown window, so only the trades inside the window are visited.
+    Updates ``keep`` in place and returns the number of trades dropped.
+    """
+    if cooldown_ns <= 0:
+        return 0
+    n = ts_ns.size
+    dropped = 0
+    i = 0
+    while i < n:
+        if not keep[i]:
+            i += 1
+            continue
+        if ts_ns[i] < _INT64_MAX - cooldown_ns:
+            nxt = np.searchsorted(ts_ns, ts_ns[i] + cooldown_ns)
+        else:
+            nxt = n
+        nxt = max(nxt, i + 1)
+        for k in range(i + 1, nxt):
+            if keep[k]:
+                keep[k] = False
+                dropped += 1
+        i = nxt
+    return dropped
+
+
+@njit(cache=True)
+def _apply_stop_loss(pnl: np.ndarray, keep: np.ndarray, start_bal: float, stop_loss_pct: float) -> int:
+    """Cap each kept loss at stop_loss_pct of the running simulated balance.
+
+    Updates ``pnl`` in place and returns the number of trades capped.
+    """
+    running_bal = start_bal
+    capped = 0
+    for i in range(pnl.size):
+        if not keep[i]:
+            continue
+        if running_bal != 0:
+            loss_pct = abs(pnl[i]) / abs(running_bal) * 100
+            if pnl[i] < 0 and loss_pct > stop_loss_pct:
+                pnl[i] = -abs(running_bal) * stop_loss_pct / 100
+                capped += 1
+        running_bal += pnl[i]
+    return capped
+
+
+@njit(cache=True)
+def _metrics_kernel(pnl: np.ndarray, bal: np.ndarray) -> tuple:
+    """Single pass over pnl/balance: (pnl_sum, pnl_mean, pnl_m2, pnl_count, min_dd, wins).
+
+    Mean/M2 use Welford's update so a constant PnL series yields an exact
+    zero variance.  NaN PnL values are skipped, matching pandas reductions.
+    """
+    peak = -np.inf
+    min_dd = 0.0
+    total = 0.0
+    mean = 0.0
+    m2 = 0.0
+    count = 0
+    wins = 0
+    for i in range(bal.size):
+        b = bal[i]
+        if b > peak:
+            peak = b
+        if peak != 0.0:
+            dd = (b - peak) / peak * 100
+            if dd < min_dd:
+                min_dd = dd
+
+        p = pnl[i]
+        if np.isnan(p):
+            continue
+        count += 1
+        total += p
+        delta = p - mean
+        mean += delta / count
+        m2 += delta * (p - mean)
+        if p > 0:
+            wins += 1
+    return total, mean, m2, count, min_dd, wins
+
+
+def _compute_metrics(pnl: np.ndarray, bal: np.ndarray) -> dict:
+    total, mean, m2, count, min_dd, wins = _metrics_kernel(pnl, bal)
+    std = np.sqrt(m2 / (count - 1)) if count > 1 else np.nan
 
     sharpe = 0.0
-    if pnl.std() != 0:
-        sharpe = float((pnl.mean() / pnl.std()) * np.sqrt(252))
+    if std != 0:
+        sharpe = float((mean / std) * np.sqrt(252))
 
     return {
-        "total_trades": len(df),
-        "total_pnl": round(float(pnl.sum()), 2),
-        "final_balance": round(float(bal.iloc[-1]), 2),
-        "max_drawdown_pct": round(abs(float(dd.min())), 2),
+        "total_trades": len(pnl),
+        "total_pnl": round(float(total), 2),
+        "final_balance": round(float(bal[-1]), 2),
+        "max_drawdown_pct": round(abs(float(min_dd)), 2),
         "sharpe_ratio": round(sharpe, 4),
-        "volatility": round(float(pnl.std()), 2),
-        "win_rate": round(float((pnl > 0).sum() / len(pnl) * 100), 2) if len(pnl) else 0,
+        "volatility": round(float(std), 2),
+        "win_rate": round(float(wins / len(pnl) * 100), 2) if len(pnl) else 0,
     }
 
 
-def _build_equity_curve(df: pd.DataFrame, balance_col: str) -> list[dict]:
-    timestamps = df["timestamp"].dt.strftime("%Y-%m-%dT%H:%M:%S").tolist()
-    balances = df[balance_col].round(2).tolist()
-    return [
-        {"timestamp": ts, "balance": float(bal)}
-        for ts, bal in zip(timestamps, balances)
-    ]
+def _build_equity_curve(timestamps: np.ndarray, balances: np.ndarray) -> dict:
+    """Columnar curve; the balance array is serialised directly by orjson."""
+    return {
+        "timestamps": pd.DatetimeIndex(timestamps).strftime("%Y-%m-%dT%H:%M:%S").tolist(),
+        "balances": np.round(balances, 2),
+    }
 
 
 def _empty_result(df: pd.DataFrame, breakdown: dict | None = None) -> dict:
-    orig = _compute_metrics(df, "balance")
+    balances = df["balance"].to_numpy(dtype=np.float64)
+    orig = _compute_metrics(df["profit_loss"].to_numpy(dtype=np.float64), balances)
     return {
         "original": orig,
         "simulated": {k: 0 for k in orig},
         "improvement": {k: 0 for k in orig},
         "summary": "All trades were excluded by the constraints.",
-        "equity_curve_original": _build_equity_curve(df, "balance"),
-        "equity_curve_simulated": [],
+        "equity_curve_original": _build_equity_curve(df["timestamp"].to_numpy(), balances),
+        "equity_curve_simulated": {"timestamps": [], "balances": np.empty(0)},
         "trades_original": len(df),
         "trades_simulated": 0,
         "excluded_breakdown": breakdown or {},
@@ -1,66 +1,94 @@
 """Vectorised feature engineering on trade DataFrames."""
 
+import numexpr as ne
 import numpy as np
 import pandas as pd
+from numba import njit
+
+from app.utils import isoformat_many
+
+
+@njit(cache=True)
+def _signed_streaks(is_win: np.ndarray) -> np.ndarray:
+    """Position within the current win/loss run: +n for wins, -n for losses."""
+    out = np.empty(is_win.size, dtype=np.int64)
+    run = 0
+    for i in range(is_win.size):
+        if i > 0 and is_win[i] == is_win[i - 1]:
+            run += 1
+        else:
+            run = 1
+        out[i] = run if is_win[i] else -run
+    return out
 
 
 def compute_trade_features(df: pd.DataFrame) -> pd.DataFrame:
     """Add all trade-level and psychological-signal features.
 
     Expects columns: timestamp, asset, side, quantity, entry_price,
-    exit_price, profit_loss, balance.  Modifies df **in-place** and returns it.
+    exit_price, profit_loss, balance.  Returns a new frame sorted by
+    timestamp; the input is left untouched.
     """
-    df = df.copy()
-    df.sort_values("timestamp", inplace=True)
-    df.reset_index(drop=True, inplace=True)
+    df = df.sort_values("timestamp", ignore_index=True)
+    # Derived columns are collected here and attached in a single concat
+    # instead of being inserted into df one at a time.
+    f = {}
 
     # ── Basic derived ──────────────────────────────────────────────
-    df["is_win"] = df["profit_loss"] > 0
-    df["pnl_percent"] = (df["profit_loss"] / df["balance"].shift(1).fillna(df["balance"])) * 100
-    df["notional"] = df["quantity"].fillna(0) * df["entry_price"].fillna(0)
-    df["position_size_pct"] = (df["notional"] / df["balance"].abs().replace(0, np.nan)) * 100
+    balance = df["balance"]
+    f["is_win"] = df["profit_loss"] > 0
+    # numexpr evaluates each expression in one fused pass, no temporaries
+    operands = {
+        "pnl": df["profit_loss"].to_numpy(dtype=np.float64),
+        "qty": df["quantity"].fillna(0).to_numpy(dtype=np.float64),
+        "ent": df["entry_price"].fillna(0).to_numpy(dtype=np.float64),
+        "bal": balance.to_numpy(dtype=np.float64),
+        "bal_prev": balance.shift(1).fillna(balance).to_numpy(dtype=np.float64),
+        "nan": np.nan,
+    }
+    f["pnl_percent"] = ne.evaluate("(pnl / bal_prev) * 100", local_dict=operands)
+    f["notional"] = pd.Series(ne.evaluate("qty * ent", local_dict=operands), index=df.index)
+    f["position_size_pct"] = ne.evaluate(
+        "(qty * ent / where(abs(bal) == 0, nan, abs(bal))) * 100", local_dict=operands
+    )
 
     # ── Holding duration (proxy: time between consecutive trades) ──
-    df["time_since_last"] = df["timestamp"].diff().dt.total_seconds().fillna(0)
-    df["holding_duration"] = df["time_since_last"]  # best proxy without explicit close time
+    f["time_since_last"] = df["timestamp"].diff().dt.total_seconds().fillna(0)
+    f["holding_duration"] = f["time_since_last"]  # best proxy without explicit close time
 
     # ── Peak balance & drawdown ────────────────────────────────────
-    df["peak_balance"] = df["balance"].cummax()
-    df["drawdown"] = (df["balance"] - df["peak_balance"]) / df["peak_balance"].replace(0, np.nan) * 100
-    df["drawdown_at_trade"] = df["drawdown"]
+    f["peak_balance"] = balance.cummax()
+    f["drawdown"] = (balance - f["peak_balance"]) / f["peak_balance"].replace(0, np.nan) * 100
+    f["drawdown_at_trade"] = f["drawdown"]
 
     # ── Streaks ────────────────────────────────────────────────────
-    win_flag = df["is_win"].astype(int)
-    streak_groups = (win_flag != win_flag.shift()).cumsum()
-    df["streak_index"] = df.groupby(streak_groups).cumcount() + 1
-    df.loc[~df["is_win"], "streak_index"] = -df.loc[~df["is_win"], "streak_index"]
+    f["streak_index"] = _signed_streaks(f["is_win"].to_numpy())
 
     # ── Rolling trade clusters (time-based) ─────────────────────────
-    df["ts_epoch"] = df["timestamp"].astype(np.int64) // 10**9
-    # Use searchsorted for O(n log n) time-based window counting
-    epochs = df["ts_epoch"].values
-    trades_1h = np.empty(len(df), dtype=np.float64)
-    trades_4h = np.empty(len(df), dtype=np.float64)
-    for i in range(len(df)):
-        t = epochs[i]
-        trades_1h[i] = np.searchsorted(epochs, t, side="right") - np.searchsorted(epochs, t - 3600, side="left")
-        trades_4h[i] = np.searchsorted(epochs, t, side="right") - np.searchsorted(epochs, t - 14400, side="left")
-    df["trades_1h"] = trades_1h
-    df["trades_4h"] = trades_4h
+    f["ts_epoch"] = df["timestamp"].astype(np.int64) // 10**9
+    # One vectorised searchsorted per window edge over the sorted epochs
+    epochs = f["ts_epoch"].to_numpy()
+    right_now = np.searchsorted(epochs, epochs, side="right")
+    f["trades_1h"] = (right_now - np.searchsorted(epochs, epochs - 3600, side="left")).astype(np.float64)
+    f["trades_4h"] = (right_now - np.searchsorted(epochs, epochs - 14400, side="left")).astype(np.float64)
 
     # ── Volatility proxy (rolling std of pnl) ──────────────────────
-    df["volatility_proxy"] = df["profit_loss"].rolling(window=20, min_periods=1).std().fillna(0)
+    f["volatility_proxy"] = df["profit_loss"].rolling(window=20, min_periods=1).std().fillna(0)
 
     # ── Post-loss / post-win indicators ──────────────────────────
-    df["prev_win"] = df["is_win"].shift(1).fillna(True).astype(bool)
-    df["after_loss"] = ~df["prev_win"]
-    df["after_win"] = df["prev_win"]
+    f["prev_win"] = f["is_win"].shift(1).fillna(True).astype(bool)
+    f["after_loss"] = ~f["prev_win"]
+    f["after_win"] = f["prev_win"]
 
     # Position size change after loss
-    df["prev_notional"] = df["notional"].shift(1)
-    df["size_delta"] = (df["notional"] - df["prev_notional"]) / df["prev_notional"].replace(0, np.nan)
+    f["prev_notional"] = f["notional"].shift(1)
+    f["size_delta"] = (f["notional"] - f["prev_notional"]) / f["prev_notional"].replace(0, np.nan)
 
-    return df
+    # ── Anchoring signals (row-level, so timeline windows just reduce them) ──
+    f["exit_entry_ratio"] = (df["exit_price"] / df["entry_price"] - 1).abs()
+    f["exit_round_offset"] = (df["exit_price"] - df["exit_price"].round(0)).abs()
+
+    return pd.concat([df, pd.DataFrame(f, index=df.index)], axis=1, copy=False)
 
 
 def compute_summary_stats(df: pd.DataFrame) -> dict:
@@ -106,28 +134,26 @@ def compute_summary_stats(df: pd.DataFrame) -> dict:
     }
 
 
-def build_equity_curve(df: pd.DataFrame) -> list[dict]:
-    """Build equity curve data for Plotly."""
-    return [
-        {
-            "timestamp": row["timestamp"].isoformat(),
-            "balance": round(float(row["balance"]), 2),
-            "drawdown": round(float(row.get("drawdown", 0)), 2),
-        }
-        for _, row in df[["timestamp", "balance", "drawdown"]].iterrows()
-    ]
+def build_equity_curve(df: pd.DataFrame) -> dict:
+    """Build columnar equity curve data for Plotly."""
+    return {
+        "timestamps": isoformat_many(df["timestamp"]),
+        "balances": df["balance"].to_numpy(dtype=np.float64).round(2),
+        "drawdowns": df["drawdown"].to_numpy(dtype=np.float64).round(2),
+    }
 
 
 def build_trade_frequency(df: pd.DataFrame) -> dict:
     """Hour-of-day × day-of-week frequency matrix."""
-    df_copy = df.copy()
-    df_copy["hour"] = df_copy["timestamp"].dt.hour
-    df_copy["day"] = df_copy["timestamp"].dt.dayofweek  # 0=Mon
-    freq = df_copy.groupby(["day", "hour"]).size().reset_index(name="count")
+    ts = df["timestamp"].dropna()
+    # Pack (day, hour) into one of 168 cells; 0=Mon
+    cell = ts.dt.dayofweek.to_numpy() * 24 + ts.dt.hour.to_numpy()
+    counts = np.bincount(cell, minlength=168)
+    nz = np.flatnonzero(counts)
     return {
-        "days": freq["day"].tolist(),
-        "hours": freq["hour"].tolist(),
-        "counts": freq["count"].tolist(),
+        "days": (nz // 24).tolist(),
+        "hours": (nz % 24).tolist(),
+        "counts": counts[nz].tolist(),
     }
 
 
@@ -147,24 +173,30 @@ def build_holding_time_comparison(df: pd.DataFrame) -> dict:
 
 def build_position_scatter(df: pd.DataFrame) -> list[dict]:
     """Position size vs PnL scatter data, with outliers clipped at 1st/99th percentile."""
-    sample = df.sample(min(len(df), 1000), random_state=42) if len(df) > 1000 else df.copy()
-
-    pnl = sample["profit_loss"]
-    size = sample["position_size_pct"] if "position_size_pct" in sample.columns else pd.Series(0, index=sample.index)
+    n = len(df)
+    if n > 1000:
+        idx = np.sort(np.random.default_rng(42).choice(n, 1000, replace=False))
+    else:
+        idx = np.arange(n)
 
-    pnl_lo, pnl_hi = float(pnl.quantile(0.01)), float(pnl.quantile(0.99))
-    size_lo, size_hi = float(size.quantile(0.01)), float(size.quantile(0.99))
+    pnl = df["profit_loss"].to_numpy(dtype=np.float64)[idx]
+    if "position_size_pct" in df.columns:
+        sizes = df["position_size_pct"].to_numpy(dtype=np.float64)[idx]
+    else:
+        sizes = np.zeros(len(idx))
+    is_win = df["is_win"].to_numpy()[idx]
+    assets = df["asset"].to_numpy()[idx]
 
-    sample = sample[
-        pnl.between(pnl_lo, pnl_hi) & size.between(size_lo, size_hi)
-    ]
+    pnl_lo, pnl_hi = np.nanquantile(pnl, [0.01, 0.99]) if len(idx) else (0.0, 0.0)
+    size_lo, size_hi = np.nanquantile(sizes, [0.01, 0.99]) if len(idx) else (0.0, 0.0)
+    keep = (pnl >= pnl_lo) & (pnl <= pnl_hi) & (sizes >= size_lo) & (sizes <= size_hi)
 
     return [
         {
-            "position_size": round(float(row.get("position_size_pct", 0)), 2),
-            "pnl": round(float(row["profit_loss"]), 2),
-            "is_win": bool(row["is_win"]),
-            "asset": str(row["asset"]),
+            "position_size": round(float(size), 2),
+            "pnl": round(float(p), 2),
+            "is_win": bool(win),
+            "asset": str(asset),
         }
-        for _, row in sample.iterrows()
+        for size, p, win, asset in zip(sizes[keep], pnl[keep], is_win[keep], assets[keep])
     ]
@@ -1,12 +1,19 @@
 """Data ingestion service – parse, validate, and bulk-load trade data."""
 
+import asyncio
 import io
+import itertools
+import re
 import uuid
 from datetime import datetime
 from typing import List
 
+import numpy as np
 import pandas as pd
-from sqlalchemy.ext.asyncio import AsyncSession
+import pyarrow as pa
+import pyarrow.csv as pacsv
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
 
 from app.models import AnalysisSession, Trade
 
@@ -14,6 +21,15 @@ REQUIRED_COLUMNS = [
     "timestamp", "asset", "side", "quantity",
     "entry_price", "exit_price", "profit_loss", "balance",
 ]
+NUMERIC_COLUMNS = REQUIRED_COLUMNS[3:]
+
+# pandas' default NA tokens, so Arrow-parsed uploads null out the same cells
+# pd.read_csv would
+NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a",
+    "nan", "null",
+]
 
 COLUMN_ALIASES = {
     "pnl": "profit_loss",
@@ -23,10 +39,31 @@ COLUMN_ALIASES = {
 }
 
 
+_ISO_RE = re.compile(r"^\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?(Z|[+-]\d{2}:?\d{2})?$")
+
+
+def _detect_fmt(sample) -> dict:
+    """Guess ``pd.to_datetime`` kwargs from one sample value ({} = let pandas infer)."""
+    text = str(sample).strip()
+    if _ISO_RE.match(text):
+        return {"format": "ISO8601"}
+    try:
+        value = float(text)
+    except ValueError:
+        return {}
+    # Epoch seconds run to ~1e10 until 2286; anything larger is milliseconds.
+    return {"unit": "ms" if abs(value) >= 1e11 else "s"}
+
+
+def _normalise_name(name) -> str:
+    """Canonical column name: lower-cased, underscored, aliases applied."""
+    name = str(name).strip().lower().replace(" ", "_")
+    return COLUMN_ALIASES.get(name, name)
+
+
 def _normalise_columns(df: pd.DataFrame) -> pd.DataFrame:
     """Lower-case columns and apply known aliases."""
-    df.columns = [c.strip().lower().replace(" ", "_") for c in df.columns]
-    df.rename(columns=COLUMN_ALIASES, inplace=True)
+    df.columns = [_normalise_name(c) for c in df.columns]
     return df
 
 
@@ -49,45 +86,49 @@ def _validate_rows(df: pd.DataFrame) -> tuple[pd.DataFrame, dict]:
         "invalid_rows": [],
     }
 
-    # 1. Drop rows with critical NaN values
-    before = len(df)
-    missing_mask = df[["timestamp", "asset", "side", "quantity", "balance"]].isnull().any(axis=1)
-    if missing_mask.sum() > 0:
-        invalid_rows = df[missing_mask].index.tolist()
+    # Each check is a mask over the full frame; the counts stay sequential
+    # (a row is only charged to the first check it fails) and the frame is
+    # sliced once at the end.
+    critical = ["timestamp", "asset", "side", "quantity", "balance"]
+
+    # 1. Rows with critical NaN values
+    missing_mask = df[critical].isnull().any(axis=1).to_numpy()
+    if missing_mask.any():
+        invalid_rows = df.index[missing_mask].tolist()
         stats["invalid_rows"].extend([
             {"row": int(idx), "reason": "missing_critical_field", "data": str(df.loc[idx].to_dict())}
             for idx in invalid_rows[:5]  # Log first 5
         ])
         logger.warning(f"Removing {missing_mask.sum()} rows with missing critical fields (rows: {invalid_rows[:10]})")
 
-    df = df.dropna(subset=["timestamp", "asset", "side", "quantity", "balance"])
-    stats["removed_missing"] = before - len(df)
-
-    # 2. Validate and normalize side values
-    df = df.copy()  # Avoid SettingWithCopyWarning
-    df["side"] = df["side"].str.upper().str.strip()
-    before = len(df)
-    invalid_side_mask = ~df["side"].isin(["BUY", "SELL"])
-    if invalid_side_mask.sum() > 0:
-        invalid_rows = df[invalid_side_mask].index.tolist()
+    # 2. Normalise side on the handful of distinct labels, not every row;
+    # anything that isn't BUY/SELL after normalising maps to code -1.
+    side = df["side"].astype("category")
+    labels = pd.Index([str(c).strip().upper() for c in side.cat.categories])
+    remap = pd.Index(["BUY", "SELL"]).get_indexer(labels)
+    codes = side.cat.codes.to_numpy()
+    side_codes = np.where(codes >= 0, remap[codes], -1)
+    df["side"] = pd.Categorical.from_codes(side_codes, categories=["BUY", "SELL"])
+    invalid_side_mask = ~missing_mask & (side_codes < 0)
+    if invalid_side_mask.any():
+        invalid_rows = df.index[invalid_side_mask].tolist()
         logger.warning(f"Removing {invalid_side_mask.sum()} rows with invalid side values (rows: {invalid_rows[:10]})")
 
-    df = df[df["side"].isin(["BUY", "SELL"])]
-    stats["removed_invalid_side"] = before - len(df)
-
-    # 3. Remove impossible values
-    before = len(df)
-    invalid_value_mask = (df["quantity"] <= 0) | (df["entry_price"] <= 0) | (df["exit_price"] <= 0)
-    if invalid_value_mask.sum() > 0:
-        invalid_rows = df[invalid_value_mask].index.tolist()
+    # 3. Impossible values
+    valid_values = (
+        (df["quantity"].to_numpy() > 0)
+        & (df["entry_price"].to_numpy() > 0)
+        & (df["exit_price"].to_numpy() > 0)
+    )
+    invalid_value_mask = ~missing_mask & ~invalid_side_mask & ~valid_values
+    if invalid_value_mask.any():
+        invalid_rows = df.index[invalid_value_mask].tolist()
         logger.warning(f"Removing {invalid_value_mask.sum()} rows with invalid values (quantity/price <= 0) (rows: {invalid_rows[:10]})")
 
-    df = df[
-        (df["quantity"] > 0) &
-        (df["entry_price"] > 0) &
-        (df["exit_price"] > 0)
-    ]
-    stats["removed_invalid_values"] = before - len(df)
+    stats["removed_missing"] = int(missing_mask.sum())
+    stats["removed_invalid_side"] = int(invalid_side_mask.sum())
+    stats["removed_invalid_values"] = int(invalid_value_mask.sum())
+    df = df[~(missing_mask | invalid_side_mask | invalid_value_mask)]
 
     stats["final_rows"] = len(df)
     stats["total_removed"] = initial - len(df)
@@ -108,7 +149,20 @@ def parse_file(contents: bytes, filename: str) -> tuple[pd.DataFrame, dict]:
     if filename.endswith((".xlsx", ".xls")):
         df = pd.read_excel(io.BytesIO(contents))
     else:
-        df = pd.read_csv(io.BytesIO(contents))
+        # Arrow's multi-threaded reader; columns still land as numpy dtypes
+        # so the numeric kernels downstream see plain ndarrays. Timestamps
+        # are kept as text for pd.to_datetime below: Arrow's own inference
+        # converts offset-bearing values to UTC, which would shift every
+        # hour-of-day and day bucket.
+        header = pd.read_csv(io.BytesIO(contents), nrows=0).columns
+        as_text = {c: pa.string() for c in header if _normalise_name(c) == "timestamp"}
+        table = pacsv.read_csv(
+            io.BytesIO(contents),
+            convert_options=pacsv.ConvertOptions(
+                column_types=as_text, null_values=NA_VALUES, strings_can_be_null=True
+            ),
+        )
+        df = table.to_pandas()
 
     df = _normalise_columns(df)
     missing = _validate(df)
@@ -116,9 +170,21 @@ def parse_file(contents: bytes, filename: str) -> tuple[pd.DataFrame, dict]:
         raise ValueError(f"Missing required columns: {missing}")
 
     # Coerce types
-    df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
-    for col in ["quantity", "entry_price", "exit_price", "profit_loss", "balance"]:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
+    if not pd.api.types.is_datetime64_any_dtype(df["timestamp"]):
+        sample = df["timestamp"].dropna()
+        fmt = _detect_fmt(sample.iloc[0]) if len(sample) else {}
+        values = df["timestamp"]
+        if "unit" in fmt:
+            # Epoch text from the CSV reader; to_datetime wants numbers for unit=
+            values = pd.to_numeric(values, errors="coerce")
+        df["timestamp"] = pd.to_datetime(values, errors="coerce", cache=True, **fmt)
+    # Excel/epoch parses may come back at second resolution; keep the ns unit
+    # the epoch arithmetic in features/counterfactual assumes.
+    df["timestamp"] = df["timestamp"].dt.as_unit("ns")
+    numeric = ["quantity", "entry_price", "exit_price", "profit_loss", "balance"]
+    needs = [c for c in numeric if not pd.api.types.is_numeric_dtype(df[c])]
+    if needs:
+        df[needs] = df[needs].apply(pd.to_numeric, errors="coerce")
 
     # Validate and clean rows
     df, validation_stats = _validate_rows(df)
@@ -131,6 +197,66 @@ def parse_file(contents: bytes, filename: str) -> tuple[pd.DataFrame, dict]:
     return df, validation_stats
 
 
+def _nullable(series: pd.Series) -> list:
+    """Float column as a Python list, with NaN mapped to None (SQL NULL)."""
+    values = series.to_numpy(dtype=np.float64)
+    out = values.astype(object)
+    out[np.isnan(values)] = None
+    return out.tolist()
+
+
+def _trade_records(df: pd.DataFrame, session_id: uuid.UUID) -> list[dict]:
+    """Plain insert dicts for a chunk of validated trades."""
+    return (
+        df[REQUIRED_COLUMNS]
+        .assign(
+            id=[uuid.uuid4() for _ in range(len(df))],
+            session_id=session_id,
+            asset=df["asset"].astype(str),
+            side=df["side"].astype(str),
+            **{c: pd.Series(_nullable(df[c]), index=df.index, dtype=object) for c in NUMERIC_COLUMNS},
+        )
+        .to_dict("records")
+    )
+
+
+async def _copy_trades(conn: AsyncConnection, df: pd.DataFrame, session_id: uuid.UUID) -> None:
+    """Stream trades into Postgres with binary COPY, bypassing SQL parsing."""
+    raw = await conn.get_raw_connection()
+    n = len(df)
+    records = zip(
+        (uuid.uuid4() for _ in range(n)),
+        itertools.repeat(session_id, n),
+        pd.DatetimeIndex(df["timestamp"]).to_pydatetime(),
+        df["asset"].astype(str).tolist(),
+        df["side"].astype(str).tolist(),
+        *(_nullable(df[c]) for c in NUMERIC_COLUMNS),
+    )
+    await raw.driver_connection.copy_records_to_table(
+        Trade.__tablename__,
+        records=records,
+        columns=["id", "session_id", *REQUIRED_COLUMNS],
+    )
+
+
+async def _insert_trades(db: AsyncSession, df: pd.DataFrame, session_id: uuid.UUID) -> None:
+    """Chunked Core INSERTs, for drivers without COPY support."""
+    # A session runs one statement at a time, so instead of concurrent
+    # INSERTs the next chunk's records are built in a worker thread while
+    # the current chunk is on the wire (10 000 rows at a time).
+    chunk_size = 10_000
+    records = _trade_records(df.iloc[:chunk_size], session_id)
+    for start in range(0, len(df), chunk_size):
+        write = db.execute(insert(Trade), records)
+        nxt = df.iloc[start + chunk_size : start + 2 * chunk_size]
+        if len(nxt):
+            _, records = await asyncio.gather(
+                write, asyncio.to_thread(_trade_records, nxt, session_id)
+            )
+        else:
+            await write
+
+
 async def ingest_dataframe(
     db: AsyncSession, df: pd.DataFrame, filename: str | None = None
 ) -> AnalysisSession:
@@ -145,27 +271,11 @@ async def ingest_dataframe(
     db.add(session)
     await db.flush()
 
-    # Chunked insert (10 000 rows at a time)
-    chunk_size = 10_000
-    for start in range(0, len(df), chunk_size):
-        chunk = df.iloc[start : start + chunk_size]
-        trades = [
-            Trade(
-                id=uuid.uuid4(),
-                session_id=session.id,
-                timestamp=row["timestamp"],
-                asset=str(row["asset"]),
-                side=str(row["side"]),
-                quantity=row.get("quantity"),
-                entry_price=row.get("entry_price"),
-                exit_price=row.get("exit_price"),
-                profit_loss=row.get("profit_loss"),
-                balance=row.get("balance"),
-            )
-            for _, row in chunk.iterrows()
-        ]
-        db.add_all(trades)
-        await db.flush()
+    conn = await db.connection()
+    if conn.dialect.driver == "asyncpg":
+        await _copy_trades(conn, df, session.id)
+    else:
+        await _insert_trades(db, df, session.id)
 
     session.status = "completed"
     return session
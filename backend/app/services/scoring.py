@@ -1,6 +1,11 @@
 """Composite bias scoring layer — orchestrates detection and returns structured results."""
 
+import hashlib
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
+from cachetools import LRUCache, TTLCache
 
 from app.services.bias_detector import (
     detect_loss_aversion,
@@ -21,12 +26,79 @@ from app.services.archetypes import classify_archetype
 from app.services.temporal import rolling_bias_timeline
 from app.utils import score_to_band
 
+# Detectors are independent reductions over the same frame; fan them out.
+_POOL = ThreadPoolExecutor(max_workers=5)
+
+# Re-analysing a session (or re-uploading the same file) yields identical
+# trades, so results are memoised by a content hash of the frame.  Entries
+# hold the featured frame and full equity curve, so the cache is bounded by
+# bytes rather than entry count.
+_RESULTS_MAX_BYTES = 512 * 1024 * 1024
+
+
+def _result_nbytes(results: dict) -> int:
+    """Approximate footprint of a cached result (featured frame + equity curve)."""
+    curve = results["equity_curve"]
+    return (
+        int(results["featured_df"].memory_usage(deep=True).sum())
+        + curve["balances"].nbytes
+        + curve["drawdowns"].nbytes
+        + sum(map(sys.getsizeof, curve["timestamps"]))
+    )
+
+
+_RESULTS: LRUCache = LRUCache(maxsize=_RESULTS_MAX_BYTES, getsizeof=_result_nbytes)
+
+# Feature-engineered trades per session, so follow-up calls (counterfactual
+# simulations) skip reloading and re-featuring. Sessions are immutable once
+# uploaded; the byte budget and TTL just bound memory.
+_FEATURED_MAX_BYTES = 512 * 1024 * 1024
+_FEATURED_CACHE: TTLCache = TTLCache(
+    maxsize=_FEATURED_MAX_BYTES,
+    ttl=3600,
+    getsizeof=lambda df: int(df.memory_usage(deep=True).sum()),
+)
+
+
+def remember_featured(session_id: str, df: pd.DataFrame) -> None:
+    """Keep a session's featured trade frame for later requests."""
+    try:
+        _FEATURED_CACHE[str(session_id)] = df
+    except ValueError:
+        pass  # larger than the whole budget; callers fall back to the DB
+
+
+def get_featured(session_id: str) -> pd.DataFrame | None:
+    """Featured trade frame for a session, or None if not cached."""
+    return _FEATURED_CACHE.get(str(session_id))
+
+
+def _fingerprint(df: pd.DataFrame) -> tuple:
+    """Content key for a trade frame: shape, column names and a row-hash digest."""
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    digest = hashlib.blake2b(row_hashes.tobytes(), digest_size=16).hexdigest()
+    return len(df), tuple(df.columns), digest
+
 
 def run_full_analysis(df: pd.DataFrame) -> dict:
     """Run the complete analysis pipeline on a trade DataFrame.
 
-    Returns a dict ready to be serialised into AnalysisResponse.
+    Returns a dict ready to be serialised into AnalysisResponse. Results are
+    cached per frame content and shared between callers, so treat them as
+    read-only.
     """
+    key = _fingerprint(df)
+    results = _RESULTS.get(key)
+    if results is None:
+        results = _run_full_analysis(df)
+        try:
+            _RESULTS[key] = results
+        except ValueError:
+            pass  # a single result larger than the whole budget is not cached
+    return results
+
+
+def _run_full_analysis(df: pd.DataFrame) -> dict:
     # 1. Feature engineering
     df = compute_trade_features(df)
 
@@ -34,11 +106,23 @@ def run_full_analysis(df: pd.DataFrame) -> dict:
     summary = compute_summary_stats(df)
 
     # 3. Bias detection
-    ot_score, ot_details = detect_overtrading(df)
-    la_score, la_details = detect_loss_aversion(df)
-    rt_score, rt_details = detect_revenge_trading(df)
-    an_score, an_details = detect_anchoring(df)
-    oc_score, oc_details = detect_overconfidence(df)
+    futures = [
+        _POOL.submit(fn, df)
+        for fn in (
+            detect_overtrading,
+            detect_loss_aversion,
+            detect_revenge_trading,
+            detect_anchoring,
+            detect_overconfidence,
+        )
+    ]
+    (
+        (ot_score, ot_details),
+        (la_score, la_details),
+        (rt_score, rt_details),
+        (an_score, an_details),
+        (oc_score, oc_details),
+    ) = [f.result() for f in futures]
 
     # 4. Archetype classification (with bias scores)
     archetype_label, archetype_details = classify_archetype(
@@ -96,3 +180,8 @@ def run_full_analysis(df: pd.DataFrame) -> dict:
         "position_scatter": pos_scatter,
         "featured_df": df,  # kept for counterfactual / coach use; not serialised
     }
+
+
+def shutdown() -> None:
+    """Stop the detector threads, dropping any queued detector runs."""
+    _POOL.shutdown(wait=False, cancel_futures=True)
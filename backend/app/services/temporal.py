@@ -1,15 +1,21 @@
 """Rolling time-windowed bias scoring for temporal evolution analysis."""
 
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 import numpy as np
+from scipy.signal import lfilter
 
 from app.services.bias_detector import (
-    detect_anchoring,
+    anchoring_window_scores,
     detect_loss_aversion,
     detect_overconfidence,
     detect_overtrading,
     detect_revenge_trading,
 )
+from app.utils import isoformat_many
+
+__all__ = ["rolling_bias_timeline", "shutdown"]
 
 BIAS_NAMES = [
     "overtrading",
@@ -19,17 +25,22 @@ BIAS_NAMES = [
     "overconfidence",
 ]
 
+# Per-window detectors; anchoring is scored for all windows at once by
+# anchoring_window_scores.
 DETECTORS = {
     "overtrading": detect_overtrading,
     "loss_aversion": detect_loss_aversion,
     "revenge_trading": detect_revenge_trading,
-    "anchoring": detect_anchoring,
     "overconfidence": detect_overconfidence,
 }
 
 MIN_TRADES_PER_WINDOW = 15
 TARGET_POINTS = 60
 
+# The detectors are independent and spend most of their time in
+# numpy/scipy kernels that release the GIL, so they run side by side.
+_POOL = ThreadPoolExecutor(max_workers=len(DETECTORS))
+
 
 def _adaptive_window_params(duration_secs: float) -> tuple[float, float]:
     """Return (window_size_secs, step_size_secs) adapted to session length.
@@ -46,17 +57,23 @@ def _adaptive_window_params(duration_secs: float) -> tuple[float, float]:
     return window, step
 
 
-def _ema_smooth(timeline: list[dict], alpha: float = 0.3) -> list[dict]:
-    """Apply exponential moving average to bias scores for visual smoothness."""
-    if len(timeline) < 2:
-        return timeline
+def _ema_smooth(scores: np.ndarray, alpha: float = 0.3) -> np.ndarray:
+    """Apply exponential moving average down each bias column of a (T, 5) score matrix."""
+    if len(scores) < 2:
+        return scores
 
-    prev = {name: timeline[0][name] for name in BIAS_NAMES}
-    for point in timeline:
-        for name in BIAS_NAMES:
-            prev[name] = alpha * point[name] + (1 - alpha) * prev[name]
-            point[name] = round(prev[name], 1)
-    return timeline
+    # y[t] = alpha * x[t] + (1 - alpha) * y[t-1] is a first-order IIR
+    # filter; seeding the state with (1 - alpha) * x[0] starts at x[0].
+    smoothed, _ = lfilter([alpha], [1.0, alpha - 1.0], scores, axis=0, zi=(1 - alpha) * scores[:1])
+    return smoothed
+
+
+def _isoformat_ns(ns: np.ndarray, tz=None) -> list[str]:
+    """``Timestamp.isoformat()`` for an array of epoch nanoseconds, in bulk."""
+    idx = pd.DatetimeIndex(ns.astype("datetime64[ns]"))
+    if tz is not None:
+        idx = idx.tz_localize("UTC").tz_convert(tz)
+    return isoformat_many(idx)
 
 
 def rolling_bias_timeline(df: pd.DataFrame) -> list[dict]:
@@ -69,6 +86,12 @@ def rolling_bias_timeline(df: pd.DataFrame) -> list[dict]:
     if len(df) < MIN_TRADES_PER_WINDOW:
         return []
 
+    # Windows are cut by binary search, which needs time-sorted rows
+    # (compute_trade_features already sorts, so this is normally a no-op).
+    if not df["timestamp"].is_monotonic_increasing:
+        df = df.sort_values("timestamp", ignore_index=True)
+    ts_ns = df["timestamp"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+
     t_min = df["timestamp"].min()
     t_max = df["timestamp"].max()
     duration_secs = (t_max - t_min).total_seconds()
@@ -80,37 +103,81 @@ def rolling_bias_timeline(df: pd.DataFrame) -> list[dict]:
     window_td = pd.Timedelta(seconds=window_secs)
     step_td = pd.Timedelta(seconds=step_secs)
 
+    # Every window start satisfying start + window <= t_max + step, and all
+    # [lo, hi) row bounds, in one vectorised pass.  Windows with too few
+    # trades are dropped up front.
+    span = t_max.value + step_td.value - window_td.value - t_min.value
+    n_windows = span // step_td.value + 1 if span >= 0 else 0
+    starts_ns = t_min.value + np.arange(n_windows, dtype=np.int64) * step_td.value
+    los = np.searchsorted(ts_ns, starts_ns, side="left")
+    his = np.searchsorted(ts_ns, starts_ns + window_td.value, side="left")
+    scored = his - los >= MIN_TRADES_PER_WINDOW
+    starts_ns, los, his = starts_ns[scored], los[scored], his[scored]
+    if not len(starts_ns):
+        return []
+
+    # Scores live in one (window, bias) matrix; dicts are only built for
+    # the response.
+    scores = np.zeros((len(starts_ns), len(BIAS_NAMES)))
+
+    # Anchoring reduces to counts and a median, so a single JIT pass over
+    # the row arrays scores every window.
+    try:
+        scores[:, BIAS_NAMES.index("anchoring")] = anchoring_window_scores(df, los, his)
+    except Exception:
+        pass
+
+    columns = [(BIAS_NAMES.index(name), fn) for name, fn in DETECTORS.items()]
+    prev_bounds = None
+
+    for w, (lo, hi) in enumerate(zip(los.tolist(), his.tolist())):
+        # Detectors are not decomposable (t-tests, correlations, medians),
+        # so each window is scored in full -- but bounds only move forward,
+        # and a window covering exactly the previous rows reuses its scores.
+        if (lo, hi) == prev_bounds:
+            scores[w] = scores[w - 1]
+            continue
+
+        window_df = df.iloc[lo:hi]
+        futures = [(col, _POOL.submit(fn, window_df)) for col, fn in columns]
+        for col, future in futures:
+            try:
+                scores[w, col], _ = future.result()
+            except Exception:
+                pass
+        prev_bounds = (lo, hi)
+
+    # Dominant bias per window from the raw (pre-smoothing) scores, first
+    # highest wins; windows where nothing scores above zero get "none".
+    best = scores.argmax(axis=1)
+    top = scores[np.arange(len(scores)), best]
+    dominant = [BIAS_NAMES[idx] if value > 0 else "none" for idx, value in zip(best.tolist(), top.tolist())]
+
+    smoothed = _ema_smooth(scores).tolist()
+    counts = (his - los).tolist()
+
+    # Window bounds as int64 offsets, formatted in three batch calls
+    half_ns = (window_td / 2).value
+    starts = _isoformat_ns(starts_ns, t_min.tz)
+    ends = _isoformat_ns(starts_ns + window_td.value, t_min.tz)
+    centers = _isoformat_ns(starts_ns + half_ns, t_min.tz)
+
     timeline: list[dict] = []
-    cursor = t_min
-
-    while cursor + window_td <= t_max + step_td:
-        w_start = cursor
-        w_end = cursor + window_td
-        window_df = df[(df["timestamp"] >= w_start) & (df["timestamp"] < w_end)]
-
-        if len(window_df) >= MIN_TRADES_PER_WINDOW:
-            center = w_start + (w_end - w_start) / 2
-            point: dict = {
-                "timestamp": center.isoformat(),
-                "window_start": w_start.isoformat(),
-                "window_end": w_end.isoformat(),
-                "trade_count": len(window_df),
-            }
-
-            best_name, best_score = "", 0.0
-            for name, detect_fn in DETECTORS.items():
-                try:
-                    score, _ = detect_fn(window_df)
-                except Exception:
-                    score = 0.0
-                point[name] = score
-                if score > best_score:
-                    best_score = score
-                    best_name = name
-
-            point["dominant_bias"] = best_name or "none"
-            timeline.append(point)
-
-        cursor += step_td
-
-    return _ema_smooth(timeline)
+    for w in range(len(starts_ns)):
+        point: dict = {
+            "timestamp": centers[w],
+            "window_start": starts[w],
+            "window_end": ends[w],
+            "trade_count": counts[w],
+        }
+        for name, value in zip(BIAS_NAMES, smoothed[w]):
+            point[name] = round(value, 1)
+        point["dominant_bias"] = dominant[w]
+        timeline.append(point)
+
+    return timeline
+
+
+def shutdown() -> None:
+    """Stop the detector threads, dropping any queued detector runs."""
+    _POOL.shutdown(wait=False, cancel_futures=True)
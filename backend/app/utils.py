@@ -1,13 +1,44 @@
+from bisect import bisect_right
+
+import numpy as np
+import pandas as pd
+
+_BANDS = ("disciplined", "elevated", "high_risk")
+_BAND_CUTS = (30, 60)
+
+
 def score_to_band(score: float) -> str:
     """Convert a 0-100 bias score to a human-readable band."""
-    if score < 30:
-        return "disciplined"
-    elif score < 60:
-        return "elevated"
-    else:
-        return "high_risk"
+    return _BANDS[bisect_right(_BAND_CUTS, score)]
 
 
 def clamp(value: float, low: float = 0.0, high: float = 100.0) -> float:
     """Clamp a value between low and high."""
     return max(low, min(high, value))
+
+
+def isoformat_many(timestamps) -> list[str]:
+    """``Timestamp.isoformat()`` over a datetime array-like, in bulk.
+
+    Like isoformat, the fraction is dropped when zero and printed to
+    microseconds unless there are nanoseconds; tz-aware stamps are printed
+    in local time with a ``+HH:MM`` offset, and missing values as ``NaT``.
+    """
+    idx = pd.DatetimeIndex(timestamps).as_unit("ns")
+    missing = idx.isna()
+    suffix = ""
+    if idx.tz is not None:
+        offsets = idx.strftime("%z").fillna("")
+        suffix = np.asarray(offsets.str[:3] + ":" + offsets.str[3:], dtype=object)
+        idx = idx.tz_localize(None)
+
+    wall = idx.to_numpy()
+    sub = idx.asi8 % 1_000_000_000
+    text = np.where(
+        sub == 0,
+        np.datetime_as_string(wall, unit="s"),
+        np.where(sub % 1000 == 0, np.datetime_as_string(wall, unit="us"), np.datetime_as_string(wall, unit="ns")),
+    ).astype(object)
+    text = text + suffix
+    text[missing] = "NaT"
+    return text.tolist()
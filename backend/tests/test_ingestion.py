@@ -0,0 +1,18 @@
+from app.services.ingestion import parse_file
+
+HEADER = "Timestamp,Asset,Side,Quantity,Entry_Price,Exit_Price,Profit_Loss,Balance\n"
+
+
+def test_parse_file_keeps_source_utc_offset():
+    contents = (
+        HEADER
+        + "2024-01-02T09:30:00+02:00,AAPL,BUY,10,100.0,101.0,10.0,10010.0\n"
+        + "2024-01-02T23:45:00+02:00,AAPL,SELL,5,101.0,100.5,2.5,10012.5\n"
+    ).encode()
+
+    df, _ = parse_file(contents, "trades.csv")
+
+    ts = df["timestamp"]
+    assert str(ts.dt.tz) == "UTC+02:00"
+    assert ts.dt.hour.tolist() == [9, 23]
+    assert ts.dt.day.tolist() == [2, 2]
@@ -40,14 +40,58 @@ export async function runCounterfactual(
   return data;
 }
 
-export async function getCoaching(
+/** Non-2xx response from the coaching stream endpoint. */
+export class CoachStreamError extends Error {
+  readonly status: number;
+
+  constructor(message: string, status: number) {
+    super(message);
+    this.name = 'CoachStreamError';
+    this.status = status;
+  }
+}
+
+/**
+ * Stream coaching over SSE. `onFeedback` receives feedback prose as it is
+ * generated; the promise resolves with the full result once the stream ends.
+ */
+export async function streamCoaching(
   sessionId: string,
-  provider?: string
+  provider: string | undefined,
+  onFeedback: (text: string) => void
 ): Promise<CoachResult> {
-  const { data } = await api.post<CoachResult>(`/coach/${sessionId}`, {
-    provider: provider || null,
+  const res = await fetch(`/api/coach/${sessionId}/stream`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ provider: provider || null }),
   });
-  return data;
+  if (!res.ok || !res.body) {
+    const body = await res.json().catch(() => null);
+    const detail = typeof body?.detail === 'string' ? body.detail : `Coaching request failed (${res.status})`;
+    throw new CoachStreamError(detail, res.status);
+  }
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let sep;
+    while ((sep = buffer.indexOf('\n\n')) !== -1) {
+      const raw = buffer.slice(0, sep);
+      buffer = buffer.slice(sep + 2);
+      const event = raw.match(/^event: (.*)$/m)?.[1];
+      const data = raw.match(/^data: (.*)$/m)?.[1];
+      if (!data) continue;
+      const payload = JSON.parse(data);
+      if (event === 'delta') onFeedback(payload.text);
+      else if (event === 'done') return payload as CoachResult;
+    }
+  }
+  throw new Error('Coaching stream ended unexpectedly');
 }
 
 export async function listSessions(): Promise<
@@ -1,5 +1,5 @@
 import { useState } from 'react';
-import { getCoaching } from '../api/client';
+import { CoachStreamError, streamCoaching } from '../api/client';
 import type { CoachResult } from '../types';
 
 interface Props { sessionId: string; }
@@ -8,12 +8,13 @@ export default function CoachPanel({ sessionId }: Props) {
   const [result, setResult] = useState<CoachResult | null>(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState('');
+  const [streamed, setStreamed] = useState('');
   const generate = async () => {
-    setLoading(true); setError('');
+    setLoading(true); setError(''); setResult(null); setStreamed('');
     try {
-      setResult(await getCoaching(sessionId, 'groq'));
-    } catch (e: any) { setError(e?.response?.data?.detail || 'Failed to generate coaching'); }
-    finally { setLoading(false); }
+      setResult(await streamCoaching(sessionId, 'groq', text => setStreamed(prev => prev + text)));
+    } catch (e) { setError(e instanceof CoachStreamError ? e.message : 'Failed to generate coaching'); }
+    finally { setLoading(false); setStreamed(''); }
   };
 
   return (
@@ -38,6 +39,13 @@ export default function CoachPanel({ sessionId }: Props) {
         {error && <p className="mt-2.5 text-[11px] text-red-400">{error}</p>}
       </div>
 
+      {/* Streaming preview */}
+      {!result && streamed && (
+        <Section icon={<SparkleIcon />} color="#7c3aed" title="Psychological Analysis">
+          <div className="text-[12px] text-[#8a90a0] leading-[1.75] whitespace-pre-line">{streamed}</div>
+        </Section>
+      )}
+
       {/* Output */}
       {result && (
         <div className="space-y-3">
@@ -193,15 +193,15 @@ export default function Counterfactual({ sessionId }: Props) {
             <Plot
               data={[
                 {
-                  x: result.equity_curve_original.map(d => d.timestamp),
-                  y: result.equity_curve_original.map(d => d.balance),
+                  x: result.equity_curve_original.timestamps,
+                  y: result.equity_curve_original.balances,
                   type: 'scatter', mode: 'lines', name: 'Original',
                   line: { color: 'rgba(90,97,116,0.4)', width: 1.5, dash: 'dot' },
                   hovertemplate: '$%{y:,.0f}<extra>Original</extra>',
                 },
                 {
-                  x: result.equity_curve_simulated.map(d => d.timestamp),
-                  y: result.equity_curve_simulated.map(d => d.balance),
+                  x: result.equity_curve_simulated.timestamps,
+                  y: result.equity_curve_simulated.balances,
                   type: 'scatter', mode: 'lines', name: 'Simulated',
                   line: { color: '#3b82f6', width: 1.5 },
                   hovertemplate: '$%{y:,.0f}<extra>Simulated</extra>',
@@ -1,8 +1,8 @@
 import Plot from 'react-plotly.js';
-import type { EquityCurvePoint, BiasTimelinePoint } from '../types';
+import type { EquityCurveData, BiasTimelinePoint } from '../types';
 
 interface Props {
-  data: EquityCurvePoint[];
+  data: EquityCurveData;
   biasTimeline?: BiasTimelinePoint[];
 }
 
@@ -99,16 +99,16 @@ export default function EquityCurve({ data, biasTimeline }: Props) {
       <Plot
         data={[
           {
-            x: data.map(d => d.timestamp),
-            y: data.map(d => d.balance),
+            x: data.timestamps,
+            y: data.balances,
             type: 'scatter', mode: 'lines', name: 'Balance',
             line: { color: '#3b82f6', width: 1.5 },
             yaxis: 'y1',
             hovertemplate: '$%{y:,.0f}<extra>Balance</extra>',
           },
           {
-            x: data.map(d => d.timestamp),
-            y: data.map(d => d.drawdown),
+            x: data.timestamps,
+            y: data.drawdowns,
             type: 'scatter', mode: 'lines', fill: 'tozeroy', name: 'Drawdown',
             line: { color: 'rgba(248,113,113,0.4)', width: 1 },
             fillcolor: 'rgba(248,113,113,0.04)',
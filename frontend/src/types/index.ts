@@ -16,10 +16,10 @@ export interface Archetype {
   description?: string;
 }
 
-export interface EquityCurvePoint {
-  timestamp: string;
-  balance: number;
-  drawdown: number;
+export interface EquityCurveData {
+  timestamps: string[];
+  balances: number[];
+  drawdowns: number[];
 }
 
 export interface TradeFrequency {
@@ -83,7 +83,7 @@ export interface AnalysisResult {
   archetype: Archetype;
   feature_summary: FeatureSummary;
   bias_timeline: BiasTimelinePoint[];
-  equity_curve: EquityCurvePoint[];
+  equity_curve: EquityCurveData;
   trade_frequency: TradeFrequency;
   holding_time_comparison: HoldingTimeComparison;
   position_scatter: PositionScatterPoint[];
@@ -105,8 +105,8 @@ export interface CounterfactualResult {
   simulated: Record<string, number>;
   improvement: Record<string, number>;
   summary: string;
-  equity_curve_original: { timestamp: string; balance: number }[];
-  equity_curve_simulated: { timestamp: string; balance: number }[];
+  equity_curve_original: { timestamps: string[]; balances: number[] };
+  equity_curve_simulated: { timestamps: string[]; balances: number[] };
   trades_original: number;
   trades_simulated: number;
   excluded_breakdown: Record<string, number>;
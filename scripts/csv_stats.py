@@ -7,6 +7,17 @@ from pathlib import Path
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+from scipy import stats
+
+# pandas' default NA tokens, so Arrow-loaded text columns report the same
+# null counts as pd.read_csv
+NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a",
+    "nan", "null",
+]
 
 
 def detect_numeric_cols(df: pd.DataFrame) -> list[str]:
@@ -14,17 +25,25 @@ def detect_numeric_cols(df: pd.DataFrame) -> list[str]:
 
 
 def detect_datetime_cols(df: pd.DataFrame) -> list[str]:
-    dt_cols = df.select_dtypes(include=["datetime", "datetimetz"]).columns.tolist()
-    if not dt_cols:
-        for col in df.columns:
-            if pd.api.types.is_string_dtype(df[col]):
-                sample = df[col].dropna().head(20)
-                try:
-                    pd.to_datetime(sample)
-                    df[col] = pd.to_datetime(df[col], errors="coerce")
-                    dt_cols.append(col)
-                except (ValueError, TypeError):
-                    pass
+    dt_cols = []
+    for col in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            dt_cols.append(col)
+            continue
+        if not pd.api.types.is_string_dtype(df[col]):
+            continue
+        values = df[col].dropna()
+        if values.empty:
+            continue
+        # Coercing probe on a small sample (no exception path), so plainly
+        # non-date columns never pay for a full parse
+        probe = pd.to_datetime(values.head(20), errors="coerce", format="mixed")
+        if probe.notna().mean() <= 0.9:
+            continue
+        parsed = pd.to_datetime(df[col], errors="coerce")
+        if parsed.notna().sum() > 0.9 * len(values):
+            df[col] = parsed
+            dt_cols.append(col)
     return dt_cols
 
 
@@ -56,22 +75,30 @@ def print_shape(df: pd.DataFrame, dt_cols: list[str]) -> None:
         if len(series) > 1:
             span_hours = (series.max() - series.min()).total_seconds() / 3600
             if span_hours > 0:
-                hourly_counts = series.dt.floor("h").value_counts().sort_index()
+                # Integer hour buckets on local wall-clock time (as dt.floor
+                # would); np.unique sorts and counts in one pass
+                if series.dt.tz is not None:
+                    series = series.dt.tz_localize(None)
+                hours = series.to_numpy(dtype="datetime64[ns]").view(np.int64) // 3_600_000_000_000
+                _, hourly_counts = np.unique(hours, return_counts=True)
                 if len(hourly_counts) > 1:
+                    mean = hourly_counts.mean()
+                    std = hourly_counts.std(ddof=1)
+                    q25, q50, q75, q90, q95, q99 = np.quantile(hourly_counts, [0.25, 0.50, 0.75, 0.90, 0.95, 0.99])
                     print(section("TRADE FREQUENCY (per hour)"))
                     print(f"    {'(based on column:':<22} '{ts_col}', span = {span_hours:,.1f} hours)")
                     print(f"    {'Overall avg:':<22} {len(series) / span_hours:,.2f}")
-                    print(f"    {'Mean:':<22} {hourly_counts.mean():,.2f}")
-                    print(f"    {'Std Dev:':<22} {hourly_counts.std():,.2f}")
+                    print(f"    {'Mean:':<22} {mean:,.2f}")
+                    print(f"    {'Std Dev:':<22} {std:,.2f}")
                     print(f"    {'Min:':<22} {hourly_counts.min():,}")
-                    print(f"    {'25th Percentile:':<22} {hourly_counts.quantile(0.25):,.1f}")
-                    print(f"    {'Median:':<22} {hourly_counts.quantile(0.50):,.1f}")
-                    print(f"    {'75th Percentile:':<22} {hourly_counts.quantile(0.75):,.1f}")
-                    print(f"    {'90th Percentile:':<22} {hourly_counts.quantile(0.90):,.1f}")
-                    print(f"    {'95th Percentile:':<22} {hourly_counts.quantile(0.95):,.1f}")
-                    print(f"    {'99th Percentile:':<22} {hourly_counts.quantile(0.99):,.1f}")
+                    print(f"    {'25th Percentile:':<22} {q25:,.1f}")
+                    print(f"    {'Median:':<22} {q50:,.1f}")
+                    print(f"    {'75th Percentile:':<22} {q75:,.1f}")
+                    print(f"    {'90th Percentile:':<22} {q90:,.1f}")
+                    print(f"    {'95th Percentile:':<22} {q95:,.1f}")
+                    print(f"    {'99th Percentile:':<22} {q99:,.1f}")
                     print(f"    {'Max:':<22} {hourly_counts.max():,}")
-                    cv = hourly_counts.std() / hourly_counts.mean() if hourly_counts.mean() > 0 else float("nan")
+                    cv = std / mean if mean > 0 else float("nan")
                     print(f"    {'Coeff of Variation:':<22} {cv:.4f}")
                     print(f"    {'# Active hours:':<22} {len(hourly_counts):,}")
 
@@ -96,28 +123,38 @@ def print_numeric_stats(df: pd.DataFrame, num_cols: list[str]) -> None:
         if series.empty:
             continue
 
+        arr = series.to_numpy()
+        n = len(arr)
+        mean = arr.mean()
+        std = arr.std(ddof=1) if n > 1 else float("nan")
+        var = arr.var(ddof=1) if n > 1 else float("nan")
+        # One partition for every percentile instead of one per call
+        q25, q50, q75, q90, q95, q99 = np.quantile(arr, [0.25, 0.50, 0.75, 0.90, 0.95, 0.99])
+        # Unbiased estimators, matching pandas (which reports 0 for a constant column)
+        skew = float("nan") if n < 3 else 0.0 if var == 0 else stats.skew(arr, bias=False)
+        kurt = float("nan") if n < 4 else 0.0 if var == 0 else stats.kurtosis(arr, bias=False)
+
         print(f"\n  ▸ {col}")
-        print(f"    {'Count:':<22} {len(series):,}")
-        print(f"    {'Mean:':<22} {format_number(series.mean())}")
-        print(f"    {'Std Dev:':<22} {format_number(series.std())}")
-        print(f"    {'Min:':<22} {format_number(series.min())}")
-        print(f"    {'25th Percentile:':<22} {format_number(series.quantile(0.25))}")
-        print(f"    {'Median (50th):':<22} {format_number(series.quantile(0.50))}")
-        print(f"    {'75th Percentile:':<22} {format_number(series.quantile(0.75))}")
-        print(f"    {'90th Percentile:':<22} {format_number(series.quantile(0.90))}")
-        print(f"    {'95th Percentile:':<22} {format_number(series.quantile(0.95))}")
-        print(f"    {'99th Percentile:':<22} {format_number(series.quantile(0.99))}")
-        print(f"    {'Max:':<22} {format_number(series.max())}")
-        print(f"    {'Sum:':<22} {format_number(series.sum())}")
-        print(f"    {'Variance:':<22} {format_number(series.var())}")
-        print(f"    {'Skewness:':<22} {format_number(series.skew())}")
-        print(f"    {'Kurtosis:':<22} {format_number(series.kurtosis())}")
-        iqr = series.quantile(0.75) - series.quantile(0.25)
-        print(f"    {'IQR:':<22} {format_number(iqr)}")
-        cv = series.std() / series.mean() if series.mean() != 0 else float("nan")
+        print(f"    {'Count:':<22} {n:,}")
+        print(f"    {'Mean:':<22} {format_number(mean)}")
+        print(f"    {'Std Dev:':<22} {format_number(std)}")
+        print(f"    {'Min:':<22} {format_number(arr.min())}")
+        print(f"    {'25th Percentile:':<22} {format_number(q25)}")
+        print(f"    {'Median (50th):':<22} {format_number(q50)}")
+        print(f"    {'75th Percentile:':<22} {format_number(q75)}")
+        print(f"    {'90th Percentile:':<22} {format_number(q90)}")
+        print(f"    {'95th Percentile:':<22} {format_number(q95)}")
+        print(f"    {'99th Percentile:':<22} {format_number(q99)}")
+        print(f"    {'Max:':<22} {format_number(arr.max())}")
+        print(f"    {'Sum:':<22} {format_number(arr.sum())}")
+        print(f"    {'Variance:':<22} {format_number(var)}")
+        print(f"    {'Skewness:':<22} {format_number(skew)}")
+        print(f"    {'Kurtosis:':<22} {format_number(kurt)}")
+        print(f"    {'IQR:':<22} {format_number(q75 - q25)}")
+        cv = std / mean if mean != 0 else float("nan")
         print(f"    {'Coeff of Variation:':<22} {format_number(cv)}")
-        print(f"    {'# Zeros:':<22} {(series == 0).sum():,}")
-        print(f"    {'# Negatives:':<22} {(series < 0).sum():,}")
+        print(f"    {'# Zeros:':<22} {(arr == 0).sum():,}")
+        print(f"    {'# Negatives:':<22} {(arr < 0).sum():,}")
         print(f"    {'# Unique:':<22} {series.nunique():,}")
 
 
@@ -140,11 +177,12 @@ def print_datetime_stats(df: pd.DataFrame, dt_cols: list[str]) -> None:
         print(f"    {'Span:':<22} {span}")
 
         if len(series) > 1:
-            diffs = series.sort_values().diff().dropna()
-            print(f"    {'Mean gap:':<22} {diffs.mean()}")
-            print(f"    {'Median gap:':<22} {diffs.median()}")
-            print(f"    {'Min gap:':<22} {diffs.min()}")
-            print(f"    {'Max gap:':<22} {diffs.max()}")
+            # Gaps as raw int64 nanoseconds; only box to Timedelta for display
+            diffs = np.diff(np.sort(series.to_numpy(dtype="datetime64[ns]").view(np.int64)))
+            print(f"    {'Mean gap:':<22} {pd.Timedelta(int(diffs.mean()), unit='ns')}")
+            print(f"    {'Median gap:':<22} {pd.Timedelta(int(np.quantile(diffs, 0.5)), unit='ns')}")
+            print(f"    {'Min gap:':<22} {pd.Timedelta(int(diffs.min()), unit='ns')}")
+            print(f"    {'Max gap:':<22} {pd.Timedelta(int(diffs.max()), unit='ns')}")
 
 
 def print_categorical_stats(df: pd.DataFrame) -> None:
@@ -179,20 +217,28 @@ def print_correlation_matrix(df: pd.DataFrame, num_cols: list[str]) -> None:
     cols = num_cols[:10]
     print(section(f"CORRELATION MATRIX (top {len(cols)} numeric cols)"))
 
-    corr = df[cols].corr()
+    # One row per column in a contiguous float64 buffer, so np.corrcoef is a
+    # single BLAS product. pandas' pairwise-complete path is only needed
+    # when some values are missing.
+    mat = np.ascontiguousarray(df[cols].to_numpy(dtype=np.float64).T)
+    if np.isnan(mat).any():
+        corr = df[cols].corr().to_numpy()
+    else:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = np.corrcoef(mat)
 
     header = "  " + " " * 18 + "".join(f"{c[:8]:>10}" for c in cols)
     print(header)
-    for row_name in cols:
-        row_vals = "".join(f"{corr.loc[row_name, c]:>10.3f}" for c in cols)
+    for i, row_name in enumerate(cols):
+        row_vals = "".join(f"{r:>10.3f}" for r in corr[i])
         print(f"  {row_name[:18]:<18}{row_vals}")
 
     print("\n  Strong correlations (|r| > 0.7, excluding self):")
     seen = set()
     found = False
     for i, c1 in enumerate(cols):
-        for c2 in cols[i + 1 :]:
-            r = corr.loc[c1, c2]
+        for j, c2 in enumerate(cols[i + 1 :], start=i + 1):
+            r = corr[i, j]
             if abs(r) > 0.7 and (c1, c2) not in seen:
                 print(f"    {c1} ↔ {c2}: {r:.4f}")
                 seen.add((c1, c2))
@@ -213,7 +259,10 @@ def main() -> None:
     parser.add_argument("csv_file", type=Path, help="Path to the CSV file")
     parser.add_argument("--top", type=int, default=None, help="Only profile the first N numeric columns")
     parser.add_argument("--no-corr", action="store_true", help="Skip the correlation matrix")
-    parser.add_argument("--sep", type=str, default=",", help="CSV delimiter (default: comma)")
+    parser.add_argument(
+        "--sep", type=str, default=",",
+        help="CSV delimiter (default: comma); multi-char and regex separators use the slower pandas reader",
+    )
 
     args = parser.parse_args()
 
@@ -222,7 +271,28 @@ def main() -> None:
         sys.exit(1)
 
     print(f"Loading {args.csv_file} ...")
-    df = pd.read_csv(args.csv_file, sep=args.sep)
+    if len(args.sep) == 1:
+        # Arrow's multi-threaded reader infers timestamps itself; strings stay
+        # Arrow-backed (no per-row Python objects), numerics stay numpy.
+        parse_options = pacsv.ParseOptions(delimiter=args.sep)
+        convert_options = pacsv.ConvertOptions(strings_can_be_null=True, null_values=NA_VALUES)
+        table = pacsv.read_csv(args.csv_file, parse_options=parse_options, convert_options=convert_options)
+        # Arrow converts offset-bearing timestamps to UTC; re-read those
+        # columns as text so detect_datetime_cols keeps the source offset.
+        tz_cols = {
+            f.name: pa.string() for f in table.schema
+            if pa.types.is_timestamp(f.type) and f.type.tz is not None
+        }
+        if tz_cols:
+            convert_options.column_types = tz_cols
+            table = pacsv.read_csv(args.csv_file, parse_options=parse_options, convert_options=convert_options)
+        df = table.to_pandas(
+            types_mapper={pa.string(): pd.StringDtype("pyarrow")}.get,
+            coerce_temporal_nanoseconds=True,
+        )
+    else:
+        # Arrow only takes a single-character delimiter
+        df = pd.read_csv(args.csv_file, sep=args.sep, engine="python")
 
     dt_cols = detect_datetime_cols(df)
     num_cols = detect_numeric_cols(df)